@@ -1,6 +1,6 @@
 __all__ = [
-    'LayoutsParsingError', 'FontsParsingError', 'ExcelParsingError',
-    'RenderDrawError', 'RenderSaveError'
+    'LayoutsParsingError', 'FontsParsingError', 'DataParsingError', 'ExcelParsingError',
+    'RenderDrawError', 'RenderSaveError', 'PrintError'
 ]
 
 class LayoutsParsingError(Exception):
@@ -9,7 +9,10 @@ class LayoutsParsingError(Exception):
 class FontsParsingError(Exception):
     """Error while parsing fonts"""
 
-class ExcelParsingError(Exception):
+class DataParsingError(Exception):
+    """Can't parse file with data (excel, csv, parquet etc.)"""
+
+class ExcelParsingError(DataParsingError):
     """Can't parse excel-file with data"""
 
 class RenderDrawError(Exception):
@@ -17,3 +20,6 @@ class RenderDrawError(Exception):
 
 class RenderSaveError(Exception):
     """Can't save rendered PDF-document"""
+
+class PrintError(Exception):
+    """Can't prepare or send print jobs to printers"""
@@ -1 +1,2 @@
 from .mainwindow import *
+from .theme import *
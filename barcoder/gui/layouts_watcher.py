@@ -0,0 +1,59 @@
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer, Signal
+
+from barcoder.parser import LayoutsParser
+
+__all__ = ['LayoutsWatcher']
+
+DEBOUNCE_MS = 300  # Редакторы сохраняют файл в несколько операций - реагируем на последнюю
+POLL_MS = 2000  # Период опроса, если системное отслеживание недоступно
+
+
+class LayoutsWatcher(QObject):
+    """
+    Отслеживает изменения директорий макетов этикеток и шрифтов
+    (системными средствами: inotify и т.п., либо периодическим опросом, если они недоступны)
+    и запускает повторный парсинг измененных файлов
+    """
+    signal_changed = Signal()
+
+    def __init__(self, layouts: LayoutsParser, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.layouts = layouts
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.schedule_refresh)  # pyright: ignore
+        self.watcher.fileChanged.connect(self.schedule_refresh)       # pyright: ignore
+
+        self.debounce = QTimer(self)
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(DEBOUNCE_MS)
+        self.debounce.timeout.connect(self.refresh)                    # pyright: ignore
+
+        self.poll = QTimer(self)
+        self.poll.setInterval(POLL_MS)
+        self.poll.timeout.connect(self.refresh)                        # pyright: ignore
+
+        self._watch()
+
+    def schedule_refresh(self):
+        """Отложенный повторный парсинг (перезапуск таймера при каждом событии)"""
+        self.debounce.start()
+
+    def refresh(self):
+        """Повторный парсинг измененных файлов, сигнал - если что-либо изменилось"""
+        if self.layouts.refresh():
+            self.signal_changed.emit()
+        self._watch()
+
+    def _watch(self):
+        """
+        Добавление в отслеживание директорий и их файлов (новые файлы, пересозданные при сохранении).
+        Если отслеживание недоступно - включается периодический опрос
+        """
+        dirs = [d for d in self.layouts.watched_dirs if d.is_dir()]
+        paths = [str(p) for d in dirs for p in (d, *(f for f in d.iterdir() if f.is_file()))]
+        watched = set(self.watcher.directories()) | set(self.watcher.files())
+        new = [p for p in paths if p not in watched]
+        failed = self.watcher.addPaths(new) if new else []
+        if failed and not self.poll.isActive():
+            self.poll.start()
@@ -8,10 +8,13 @@ from PySide6.QtWidgets import QFileDialog as fd
 
 from .ui_mainwindow import Ui_MainWindow
 from .previewwindow import PreviewWindow
+from .layouts_watcher import LayoutsWatcher
+from .queuewindow import QueueWindow
 
-from barcoder.parser import ExcelParser, LayoutsParser, Label, LabelType, LabelQtyMode, Dataset, Font
+from barcoder.parser import DataParser, parse_data_file, LayoutsParser, Label, LabelType, LabelQtyMode, Dataset, Font
 from barcoder.render import RenderThread
-from barcoder.exceptions import ExcelParsingError
+from barcoder.printing import Printer, PrintThread
+from barcoder.exceptions import DataParsingError
 import config as conf
 
 __all__ = ['MainWindow']
@@ -21,6 +24,7 @@ class ParsedData(NamedTuple):
     colnames: Sequence[str] = []
     correct: Dataset = []
     incorrect: Dataset = []
+    correct_rows: Sequence[int] = []  # Номера рядов файла корректных данных
 
 
 class MainWindow(QMainWindow):
@@ -29,24 +33,35 @@ class MainWindow(QMainWindow):
     Опрос пользователя (Какой размер этикетки, ее тип и т.д.).
     И непосредственный запуск генерации итогового PDF файла с готовыми этикетками
     """
-    def __init__(self, layouts: LayoutsParser, fonts: Sequence[Font], parent=None):
+    def __init__(self, parent=None):
         super(MainWindow, self).__init__(parent)
         self.ui = Ui_MainWindow()
         self.ui.setupUi(self)
 
         self.render_thread: RenderThread = RenderThread(self)
+        self.print_thread = PrintThread(self)
         self.preview_window = PreviewWindow()
+        self.queue_window = QueueWindow()
         self.progress_dlg: pd
 
-        self.layouts = layouts  # Макеты этикеток
-        self.fonts = fonts  # Список шрифтов
+        self.layouts: LayoutsParser  # Макеты этикеток (устанавливаются после показа окна)
+        self.fonts: Sequence[Font] = ()  # Список шрифтов
         self.data = ParsedData()  # Распарсенные данные
 
         # Поля текущих установленных значений
-        self.file_attached: Path  # Excel файл с привязками (данные для этикеток) для парсинга
+        self.file_attached: Path  # Файл с привязками (данные для этикеток) для парсинга
         self.is_file_attached: bool = False
         self.update_ui()
         self.init_events()
+        self.ui.statusbar.showMessage('Загрузка макетов этикеток...')
+
+    def set_layouts(self, layouts: LayoutsParser, fonts: Sequence[Font]):
+        """
+        Установка макетов этикеток и шрифтов.
+        Вызывается уже после показа окна, чтобы парсинг макетов не задерживал запуск
+        """
+        self.layouts = layouts
+        self.fonts = fonts
 
         # Установка начальных пользовательских данных в селекторы
         [self.ui.cmb_type.addItem(t.value, userData=t) for t in layouts.types]
@@ -54,6 +69,29 @@ class MainWindow(QMainWindow):
         self.ui.cmb_type.setCurrentIndex(0)
         self.ui.cmb_qty_mode.setCurrentIndex(0)
         self.cmb_label_refresh()  # Размеры этикеток (в соотв-ии с типом)
+        self.show_layouts_errors()
+        self.update_ui()
+
+        # Повторный парсинг макетов при изменении файлов (без перезапуска приложения)
+        self.layouts_watcher = LayoutsWatcher(layouts, self)
+        self.layouts_watcher.signal_changed.connect(self.layouts_changed)      # pyright: ignore
+
+    def layouts_changed(self):
+        """Обработка события: изменились файлы макетов этикеток или шрифтов"""
+        self.fonts = self.layouts.fonts
+        self.cmb_label_refresh(keep_current=True)
+        self.show_layouts_errors()
+        self.update_ui()
+
+    def show_layouts_errors(self):
+        """Сообщение в строке состояния о некорректных файлах макетов"""
+        if errors := self.layouts.errors:
+            names = ', '.join(f.name for f in errors)
+            self.ui.statusbar.showMessage(f'Некорректные макеты этикеток (пропущены): {names}')
+            self.ui.statusbar.setToolTip('\n'.join(f'{f}: {err}' for f, err in errors.items()))
+        else:
+            self.ui.statusbar.clearMessage()
+            self.ui.statusbar.setToolTip('')
 
     def init_events(self):
         self.ui.cmb_type.currentIndexChanged.connect(self.cmb_type_changed)     # pyright: ignore
@@ -63,6 +101,9 @@ class MainWindow(QMainWindow):
 
         self.ui.menu_file_attach.triggered.connect(self.menu_item_click)        # pyright: ignore
         self.ui.menu_file_unattach.triggered.connect(self.menu_item_click)      # pyright: ignore
+        self.ui.menu_file_batch.triggered.connect(self.menu_item_click)         # pyright: ignore
+        self.ui.menu_file_print.triggered.connect(self.menu_item_click)         # pyright: ignore
+        self.render_thread.signal_finish.connect(self.offer_print)              # pyright: ignore
         self.ui.menu_help_about.triggered.connect(self.menu_item_click)         # pyright: ignore
         self.ui.menu_help_tutor.triggered.connect(self.menu_item_click)         # pyright: ignore
 
@@ -73,6 +114,7 @@ class MainWindow(QMainWindow):
         correct = self.all_items_corrects()
         self.ui.menu_file_attach.setDisabled(correct)
         self.ui.menu_file_unattach.setEnabled(correct)
+        self.ui.menu_file_print.setEnabled(bool(conf.PRINTERS))
         self.ui.btn_file_preview.setEnabled(correct)
         self.ui.btn_create.setEnabled(correct)
         if correct:
@@ -87,9 +129,13 @@ class MainWindow(QMainWindow):
 
     def update_preview_window(self):
         """Обновление окна предпросмотра файла"""
-        self.preview_window.reset()
         if self.data.correct or self.data.incorrect:
             self.preview_window.set_data(self.data.colnames, self.data.correct, self.data.incorrect)
+        else:
+            self.preview_window.reset()
+        if type(label := self.ui.cmb_label.currentData()) is Label:
+            self.preview_window.set_label(label, self.ui.cmb_type.currentData(),
+                                          self.ui.cmb_qty_mode.currentData(), self.fonts)
 
     def btn_click(self):
         """Обработка событий нажатий кнопок"""
@@ -122,17 +168,35 @@ class MainWindow(QMainWindow):
             self.ui.lb_filename.clear()
             self.update_preview_window()
 
+        if item_name == 'menu_file_batch':
+            self.enqueue_files()  # Пакетная обработка: добавление файлов в очередь
+
+        if item_name == 'menu_file_print':
+            fp, _ = fd.getOpenFileName(self, 'Выберите файл pdf с ШК для печати',
+                                       dir=str(conf.HOME_DIR), filter='PDF Files (*.pdf)')
+            if fp:
+                self.print_file(fp)
+
         self.update_ui()
 
-    def cmb_label_refresh(self):
-        """Обновить селектор выбора этикетки в соответствии с типом"""
+    def cmb_label_refresh(self, keep_current: bool = False):
+        """
+        Обновить селектор выбора этикетки в соответствии с типом.
+        keep_current: оставить выбранной текущую этикетку (по имени), если она есть в новом списке
+        """
+        current = self.ui.cmb_label.currentData()
         self.ui.cmb_label.clear()
         type_ = self.ui.cmb_type.currentData()
         for lb in reversed(self.layouts.get_labels_by_type(type_)):
             w, h = lb.size.width, lb.size.height
             caption = f'{w}✕{h} mm: {lb.name}'
             self.ui.cmb_label.addItem(caption, userData=lb)
-        self.ui.cmb_label.setCurrentIndex(0)
+
+        index = 0
+        if keep_current and type(current) is Label:
+            names = [self.ui.cmb_label.itemData(i).name for i in range(self.ui.cmb_label.count())]
+            index = names.index(current.name) if current.name in names else 0
+        self.ui.cmb_label.setCurrentIndex(index)
 
     def cmb_type_changed(self):
         """Обработка события: изменение типа этикетки"""
@@ -143,11 +207,12 @@ class MainWindow(QMainWindow):
 
     def attach_and_parse_file(self):
         """
-        Подключение Excel файла и его парсинг
+        Подключение файла с данными (Excel, CSV, Parquet) и его парсинг
         """
+        extensions = ' '.join(f'*{ext}' for ext in DataParser.supported_extensions())
         fp, _ = fd.getOpenFileName(
-            self, 'Выберите Excel-файл с артикулами',
-            dir=str(Path.home()), filter='Excel Files (*.xlsx *.xlsm)'
+            self, 'Выберите файл с артикулами',
+            dir=str(Path.home()), filter=f'Data Files ({extensions})'
         )
         if fp and Path(fp).is_file():
             fp = Path(fp)
@@ -155,20 +220,59 @@ class MainWindow(QMainWindow):
             self.file_attached, self.is_file_attached = fp, True
             self.parse_file_data()
 
+    def enqueue_files(self):
+        """
+        Добавление нескольких файлов в очередь пакетной обработки
+        с текущими типом, размером этикетки и кол-ым режимом
+        """
+        label = self.ui.cmb_label.currentData()
+        if type(label) is not Label:
+            return
+
+        extensions = ' '.join(f'*{ext}' for ext in DataParser.supported_extensions())
+        files, _ = fd.getOpenFileNames(
+            self, 'Выберите файлы с артикулами',
+            dir=str(Path.home()), filter=f'Data Files ({extensions})'
+        )
+        if not files:
+            return
+        output_dir = fd.getExistingDirectory(self, 'Укажите директорию для файлов pdf с ШК', dir=str(conf.HOME_DIR))
+        if not output_dir:
+            return
+
+        self.queue_window.enqueue([Path(f) for f in files], Path(output_dir), label,
+                                  self.ui.cmb_type.currentData(), self.ui.cmb_qty_mode.currentData(), self.fonts)
+        self.queue_window.show()
+
+    def offer_print(self):
+        """Предложить отправить созданный PDF на принтеры (если они заданы в конфигурации)"""
+        if not conf.PRINTERS or self.render_thread.progress.failure:
+            return
+        ans = mb.question(self, 'Печать', f'Отправить этикетки на принтеры ({len(conf.PRINTERS)} шт.)?',
+                          mb.Yes, mb.No)
+        if ans == mb.Yes:
+            self.print_file(self.render_thread.job.filepath)
+
+    def print_file(self, filepath: str):
+        """Отправка PDF файла с этикетками на пул принтеров"""
+        if not self.print_thread.isRunning():
+            self.print_thread.print_file(filepath, [Printer(*p) for p in conf.PRINTERS])
+
     def parse_file_data(self) -> bool:
         """
         Собрать данные в зависимости от типа этикетки
         Возвращает True или False в зависимости от успеха
         """
         try:
-            parsed = ExcelParser(self.file_attached, self.ui.cmb_type.currentData())
+            parsed = parse_data_file(self.file_attached, self.ui.cmb_type.currentData())
             self.data = ParsedData(parsed.colnames,
                                    parsed.correct_data,
-                                   parsed.incorrect_data)
+                                   parsed.incorrect_data,
+                                   parsed.correct_rows)
             return True
 
-        except ExcelParsingError as e:
-            msg = mb(mb.Critical, 'Ошибка чтения данных', 'Не удалось получить данные из Excel файла')
+        except DataParsingError as e:
+            msg = mb(mb.Critical, 'Ошибка чтения данных', 'Не удалось получить данные из файла')
             msg.setDetailedText(str(e))
             msg.show()
         return False
@@ -200,5 +304,6 @@ class MainWindow(QMainWindow):
                 label=self.ui.cmb_label.currentData(),
                 label_type=self.ui.cmb_type.currentData(),
                 qty_mode=self.ui.cmb_qty_mode.currentData(),
-                fonts=self.fonts
+                fonts=self.fonts,
+                rows=self.data.correct_rows
             )
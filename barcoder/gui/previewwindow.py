@@ -1,9 +1,17 @@
+from collections import OrderedDict
 from collections.abc import Sequence
-from PySide6.QtWidgets import QWidget, QTableWidget, QTableWidgetItem, QHeaderView
-from PySide6.QtCore import Qt
+from typing import Hashable, Optional
+from PySide6.QtWidgets import QApplication, QWidget, QTableWidget, QTableWidgetItem, QHeaderView
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QImage, QPixmap
 
 from .ui_previewwindow import Ui_PreviewWindow
-from barcoder.parser import Dataset
+from barcoder.parser import Dataset, Label, LabelType, LabelQtyMode, Font
+from barcoder.render import PreviewRenderThread
+
+PREVIEW_CACHE_SIZE = 256  # Кол-во изображений этикеток в кэше предпросмотра
+TABLE_FILL_ROWS = 100  # Кол-во заполняемых строк таблицы, пока ее размер неизвестен (окно скрыто)
+SCROLL_DEBOUNCE_MS = 150
 
 
 class PreviewWindow(QWidget):
@@ -14,36 +22,139 @@ class PreviewWindow(QWidget):
         if windowModality:
             self.setWindowModality(windowModality)
 
+        # Предпросмотр этикеток: отрисовываются только выбранная и видимые в таблице строки
+        self.correct_data: Dataset = []
+        self.label_key: Optional[Hashable] = None
+        self.cache: OrderedDict[Hashable, QImage] = OrderedDict()
+        # Таблицы заполняются по мере прокрутки: набор данных таблицы и отметки заполненных строк
+        self.table_data: dict[QTableWidget, tuple[Dataset, bytearray]] = {}
+        self.render_thread = PreviewRenderThread(self)
+        self.render_thread.signal_rendered.connect(self.label_rendered)          # pyright: ignore
+        QApplication.instance().aboutToQuit.connect(self.render_thread.stop)   # pyright: ignore
+
+        self.scroll_timer = QTimer(self)
+        self.scroll_timer.setSingleShot(True)
+        self.scroll_timer.setInterval(SCROLL_DEBOUNCE_MS)
+        self.scroll_timer.timeout.connect(self.request_preview)                 # pyright: ignore
+        self.ui.table_successed.verticalScrollBar().valueChanged.connect(lambda _: self.scroll_timer.start())  # pyright: ignore
+        self.ui.table_successed.currentCellChanged.connect(self.request_preview)                  # pyright: ignore
+        for table in (self.ui.table_successed, self.ui.table_broken):
+            table.verticalScrollBar().valueChanged.connect(lambda _, t=table: self._fill_visible(t))  # pyright: ignore
+
     def reset(self):
-        self.ui.table_successed.clearContents()
-        self.ui.table_broken.clearContents()
+        self.set_data((), [], [])
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        for table in self.table_data:
+            self._fill_visible(table)
+        self.request_preview()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.render_thread.cancel()  # Окно закрыто: не начатые отрисовки не нужны
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        for table in self.table_data:
+            self._fill_visible(table)
 
-    @staticmethod
-    def _fill_table(table: QTableWidget, columns: Sequence[str], list_data: Dataset):
+    def _fill_table(self, table: QTableWidget, columns: Sequence[str], list_data: Dataset) -> bool:
+        """
+        Установить набор данных таблицы: ячейки создаются только для видимых строк (см. _fill_visible).
+        Возвращает False, если таблица уже показывает этот набор данных
+        """
+        if table in self.table_data and self.table_data[table][0] is list_data:
+            return False
+        self.table_data[table] = (list_data, bytearray(len(list_data)))
         table.clearContents()
         table.setColumnCount(len(columns))
         table.setRowCount(len(list_data))
 
         table.setHorizontalHeaderLabels(columns)
-
-        for row, data in enumerate(list_data):
-            for col, field in enumerate(data._fields):
-                item = QTableWidgetItem(str(data._asdict()[field]))
-                table.setItem(row, col, item)
-
         table.horizontalHeader().setStretchLastSection(True)
         table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self._fill_visible(table)
+        return True
+
+    def _fill_visible(self, table: QTableWidget):
+        """Заполнить видимые (еще не заполненные) строки таблицы"""
+        list_data, filled = self.table_data.get(table, ((), bytearray()))
+        if not list_data:
+            return
+        first = max(table.rowAt(0), 0)
+        last = table.rowAt(table.viewport().height() - 1)
+        last = min(first + TABLE_FILL_ROWS, len(list_data)) - 1 if last < 0 else last
+        for row in range(first, last + 1):
+            if filled[row]:
+                continue
+            filled[row] = 1
+            for col, value in enumerate(list_data[row]):
+                table.setItem(row, col, QTableWidgetItem(str(value)))
 
     def set_data(self, colnames: Sequence[str], correct_data: Dataset, incorrect_data: Dataset):
         """
-        Заполнить таблицу предпросмотра данными
+        Заполнить таблицу предпросмотра данными (таблицы перестраиваются только при смене данных)
         """
+        if correct_data is not self.correct_data:  # Новые данные - кэш изображений устарел
+            self.correct_data = correct_data
+            self.cache.clear()
+            self.ui.lb_preview.clear()
+        changed = self._fill_table(self.ui.table_successed, colnames, correct_data)
+        changed |= self._fill_table(self.ui.table_broken, colnames, incorrect_data)
+        if not changed:
+            return
         if correct_data:
-            self._fill_table(self.ui.table_successed, colnames, correct_data)
             self.ui.tabWidget.setTabEnabled(1, False)  # Вкладка с некоррестными данными не активна
             self.ui.tabWidget.setCurrentIndex(0)       # Вкладка с корректными - открыта по умолчанию
 
         if incorrect_data:
-            self._fill_table(self.ui.table_broken, colnames, incorrect_data)
             self.ui.tabWidget.setTabEnabled(1, True)  # Вкладка с некорректными данными активна
             self.ui.tabWidget.setCurrentIndex(1)      # открыта по умолчанию
+
+    def set_label(self, label: Label, label_type: LabelType, qty_mode: LabelQtyMode, fonts: Sequence[Font]):
+        """
+        Установить этикетку, которой отрисовывается предпросмотр
+        """
+        self.label_key = (repr(label), label_type, qty_mode)
+        self.render_thread.set_label(label, label_type, fonts)
+        self.request_preview()
+
+    def request_preview(self):
+        """
+        Запрос фоновой отрисовки выбранной и видимых строк (отсутствующих в кэше).
+        Устаревшие запросы (строки, которые уже прокручены) отменяются
+        """
+        table = self.ui.table_successed
+        if self.label_key is None or not self.correct_data or not self.isVisible():
+            return
+
+        first = max(table.rowAt(0), 0)
+        last = table.rowAt(table.viewport().height() - 1)
+        last = len(self.correct_data) - 1 if last < 0 else last
+        rows = [r for r in (table.currentRow(), *range(first, last + 1)) if 0 <= r < len(self.correct_data)]
+
+        self.show_preview()
+        items = [(self._key(r), self.correct_data[r]) for r in dict.fromkeys(rows)]
+        self.render_thread.request([(k, d) for k, d in items if k not in self.cache])
+
+    def label_rendered(self, key: Hashable, image: QImage):
+        """Обработка события: этикетка отрисована в фоне"""
+        self.cache[key] = image
+        self.cache.move_to_end(key)
+        while len(self.cache) > PREVIEW_CACHE_SIZE:
+            self.cache.popitem(last=False)
+        self.show_preview()
+
+    def show_preview(self):
+        """Показать изображение этикетки выбранной строки (если уже отрисовано)"""
+        row = self.ui.table_successed.currentRow()
+        if row < 0 or (image := self.cache.get(self._key(row))) is None:
+            return
+        pixmap = QPixmap.fromImage(image)
+        self.ui.lb_preview.setPixmap(pixmap.scaled(self.ui.lb_preview.size(), Qt.KeepAspectRatio,
+                                                   Qt.SmoothTransformation))
+
+    def _key(self, row: int) -> Hashable:
+        """Ключ кэша изображений: (строка, этикетка, кол-ый режим)"""
+        return (row, self.label_key)
@@ -0,0 +1,124 @@
+from pathlib import Path
+from typing import Optional, Sequence
+
+from PySide6.QtWidgets import QApplication, QWidget, QTableWidgetItem, QHeaderView, QProgressBar
+from PySide6.QtWidgets import QMessageBox as mb
+
+from .ui_queuewindow import Ui_QueueWindow
+from barcoder.parser import Label, LabelType, LabelQtyMode, Font
+from barcoder.render import BatchJob, RenderQueue
+
+__all__ = ['QueueWindow']
+
+
+class QueueWindow(QWidget):
+    """
+    Окно очереди пакетной обработки: задания (файл + этикетка), их состояние и прогресс.
+    Позволяет изменить приоритет задания или отменить его
+    """
+    COLUMNS = ('Файл', 'Тип этикетки', 'Этикетка', 'Режим', 'Состояние', 'Прогресс')
+
+    def __init__(self, parent=None):
+        super(QueueWindow, self).__init__(parent)
+        self.ui = Ui_QueueWindow()
+        self.ui.setupUi(self)
+
+        self.queue = RenderQueue(parent=self)
+        self.queue.signal_changed.connect(self.refresh_table)                   # pyright: ignore
+        QApplication.instance().aboutToQuit.connect(self.queue.shutdown)       # pyright: ignore
+
+        self.ui.btn_job_up.clicked.connect(self.btn_click)                      # pyright: ignore
+        self.ui.btn_job_down.clicked.connect(self.btn_click)                    # pyright: ignore
+        self.ui.btn_job_cancel.clicked.connect(self.btn_click)                  # pyright: ignore
+
+        table = self.ui.table_jobs
+        table.setColumnCount(len(self.COLUMNS))
+        table.setHorizontalHeaderLabels(self.COLUMNS)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+
+    def enqueue(self,
+                files: Sequence[Path],
+                output_dir: Path,
+                label: Label,
+                label_type: LabelType,
+                qty_mode: LabelQtyMode,
+                fonts: Sequence[Font]):
+        """
+        Добавить файлы в очередь (итоговые PDF - в output_dir, с именами исходных файлов).
+        Если такие PDF уже есть в директории - пользователь выбирает: перезаписать их или сохранить под новыми именами
+        """
+        outputs = self._outputs(files, output_dir, keep_existing=False)
+        existing = [output for output in outputs if output.exists()]
+        if existing:
+            names = '\n'.join(output.name for output in existing[:10])
+            more = f'\n... и еще {len(existing) - 10}' if len(existing) > 10 else ''
+            answer = mb.question(
+                self, 'Файлы уже существуют',
+                f'В директории {output_dir} уже есть файлы:\n{names}{more}\n\n'
+                'Перезаписать их? (Нет - сохранить под новыми именами)',
+                mb.Yes | mb.No | mb.Cancel, mb.No
+            )
+            if answer == mb.Cancel:
+                return
+            if answer == mb.No:
+                outputs = self._outputs(files, output_dir, keep_existing=True)
+        for file, output in zip(files, outputs):
+            self.queue.enqueue(file, output, label, label_type, qty_mode, fonts)
+
+    def _outputs(self, files: Sequence[Path], output_dir: Path, keep_existing: bool) -> list[Path]:
+        """
+        Имена итоговых PDF: имя исходного файла, при совпадении - с номером '<имя> (n).pdf'
+        (файлы с одинаковым именем и разными расширениями, задания в очереди, keep_existing - файлы в директории)
+        """
+        taken = {job.output for job in self.queue.jobs}
+        outputs = []
+        for file in files:
+            output = output_dir / f'{file.stem}.pdf'
+            n = 1
+            while output in taken or (keep_existing and output.exists()):
+                output, n = output_dir / f'{file.stem} ({n}).pdf', n + 1
+            taken.add(output)
+            outputs.append(output)
+        return outputs
+
+    def btn_click(self):
+        """Обработка событий нажатий кнопок"""
+        btn_name = self.sender().objectName()
+        if (job := self.selected_job()) is None:
+            return
+
+        if btn_name == 'btn_job_up':
+            self.queue.move(job, -1)
+
+        if btn_name == 'btn_job_down':
+            self.queue.move(job, 1)
+
+        if btn_name == 'btn_job_cancel':
+            self.queue.cancel(job)
+
+        self.ui.table_jobs.selectRow(self.queue.jobs.index(job))
+
+    def selected_job(self) -> Optional[BatchJob]:
+        row = self.ui.table_jobs.currentRow()
+        return self.queue.jobs[row] if 0 <= row < len(self.queue.jobs) else None
+
+    def refresh_table(self):
+        """Обновление таблицы заданий"""
+        table = self.ui.table_jobs
+        table.setRowCount(len(self.queue.jobs))
+        for row, job in enumerate(self.queue.jobs):
+            state = job.state.value + (f': {job.error}' if job.error else '')
+            if job.failed or job.incorrect:
+                state += f' (ошибок: {job.failed}, некорр. строк: {job.incorrect})'
+            cells = (job.file.name, job.label_type.value, job.label.name, job.qty_mode.name, state)
+            for col, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                item.setToolTip(str(job.output) if col == 0 else text)
+                table.setItem(row, col, item)
+
+            bar = table.cellWidget(row, len(cells))
+            if not isinstance(bar, QProgressBar):
+                bar = QProgressBar()
+                table.setCellWidget(row, len(cells), bar)
+            bar.setMaximum(max(job.total, 1))
+            bar.setValue(job.processed)
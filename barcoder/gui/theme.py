@@ -0,0 +1,85 @@
+import json
+import shutil
+from importlib import metadata
+from importlib.util import find_spec
+from pathlib import Path
+
+from PySide6.QtCore import QDir
+from PySide6.QtGui import QColor, QFontDatabase, QGuiApplication, QPalette
+from PySide6.QtWidgets import QApplication
+
+__all__ = ['apply_theme', 'build_theme_cache']
+
+"""
+Применение темы qt_material с кэшированием скомпилированной таблицы стилей и иконок
+"""
+
+QSS_FILENAME = 'stylesheet.qss'
+META_FILENAME = 'theme.json'
+ICONS_DIRNAME = 'icons'
+
+
+def apply_theme(app: QApplication, theme_name: str, cache_dir: Path | str) -> None:
+    """
+    Применяет тему qt_material к приложению.
+    Таблица стилей и иконки темы генерируются один раз и кэшируются в cache_dir,
+    повторная генерация - только при смене темы или версии qt_material
+    """
+    theme_dir = Path(cache_dir) / f'{theme_name}-{_qt_material_version()}'
+    qss, meta = theme_dir / QSS_FILENAME, theme_dir / META_FILENAME
+    if not (qss.is_file() and meta.is_file()):
+        build_theme_cache(theme_name, theme_dir)
+
+    package_dir = _qt_material_dir()
+    for font in (package_dir / 'fonts' / 'roboto').glob('*.ttf'):
+        QFontDatabase.addApplicationFont(str(font))
+
+    QDir.addSearchPath('icon', str(theme_dir / ICONS_DIRNAME))
+    QDir.addSearchPath('qt_material', str(package_dir / 'resources'))
+
+    # Цвет текста-заполнителя, как его устанавливает qt_material
+    primary = json.loads(meta.read_text(encoding='utf8'))['primaryColor']
+    palette = QGuiApplication.palette()
+    palette.setColor(QPalette.PlaceholderText, QColor(*[int(primary[i:i + 2], 16) for i in range(1, 6, 2)], 92))
+    QGuiApplication.setPalette(palette)
+
+    app.setStyleSheet(qss.read_text(encoding='utf8'))
+
+
+def build_theme_cache(theme_name: str, theme_dir: Path | str) -> None:
+    """
+    Генерация таблицы стилей и иконок темы qt_material в директорию theme_dir.
+    Кэши других тем (версий) из той же родительской директории удаляются
+    """
+    import qt_material  # Тяжелый импорт (jinja2) - только при отсутствии кэша
+
+    theme_dir = Path(theme_dir)
+    for old in theme_dir.parent.glob('*'):
+        if old.is_dir() and old != theme_dir:
+            shutil.rmtree(old, ignore_errors=True)
+    theme_dir.mkdir(parents=True, exist_ok=True)
+
+    theme_file = f'{theme_name}.xml'
+    stylesheet = qt_material.build_stylesheet(theme_file, parent=str((theme_dir / ICONS_DIRNAME).absolute()))
+    theme = qt_material.get_theme(theme_file)
+
+    (theme_dir / QSS_FILENAME).write_text(stylesheet, encoding='utf8')
+    (theme_dir / META_FILENAME).write_text(json.dumps({
+        'theme': theme_name,
+        'qt_material': _qt_material_version(),
+        'primaryColor': theme['primaryColor'],
+    }), encoding='utf8')
+
+
+def _qt_material_version() -> str:
+    """Версия qt_material (ключ кэша)"""
+    try:
+        return metadata.version('qt-material')
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+def _qt_material_dir() -> Path:
+    """Директория пакета qt_material (без его импорта)"""
+    spec = find_spec('qt_material')
+    return Path(next(iter(spec.submodule_search_locations)))
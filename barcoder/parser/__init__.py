@@ -1,4 +1,8 @@
+from .dataset import *
+from .data_parser import *
 from .excel_parser import *
+from .csv_parser import *
+from .parquet_parser import *
 from .layouts_parser import *
 from .fonts_parser import *
 from .typing import *
@@ -0,0 +1,57 @@
+import codecs
+import csv
+from typing import Iterable, Type
+from pathlib import Path
+
+from .typing import DocModel, RowNum
+from .data_parser import DataParser, Row
+from barcoder.exceptions import DataParsingError
+
+__all__ = ['CsvParser']
+
+"""
+Собирает данные из CSV/TSV файла (потоковое чтение модулем csv)
+"""
+
+SAMPLE_SIZE = 64 * 1024
+DELIMITERS = ',;\t'
+ENCODINGS = ('utf-8-sig', 'cp1251')
+
+
+class CsvParser(DataParser, extensions=('.csv', '.tsv')):
+    """
+    Собирает данные из CSV/TSV документа в соответствии с типом этикетирования.
+    Номера колонок и строк - такие же, как у Excel документа (выгрузка того же листа)
+    """
+    def _read_rows(self, file: Path, model: Type[DocModel]) -> Iterable[tuple[RowNum, Row]]:
+        with file.open('rb') as f:
+            sample = f.read(SAMPLE_SIZE)
+        encoding = self._detect_encoding(sample)
+        text = codecs.getincrementaldecoder(encoding)().decode(sample)
+
+        delimiter = '\t'
+        if file.suffix.lower() != '.tsv':
+            try:
+                delimiter = csv.Sniffer().sniff(text, delimiters=DELIMITERS).delimiter
+            except csv.Error:
+                delimiter = ';' if text.count(';') > text.count(',') else ','
+
+        columns = [col - 1 for col in model.columns]
+        try:
+            with file.open(encoding=encoding, newline='') as f:
+                for row, values in enumerate(csv.reader(f, delimiter=delimiter), start=1):
+                    if row >= model.start_row:
+                        yield row, [values[col] if col < len(values) else None for col in columns]
+        except (csv.Error, UnicodeDecodeError) as e:
+            raise DataParsingError(f"Can't read csv-file: {e}")
+
+    @staticmethod
+    def _detect_encoding(sample: bytes) -> str:
+        """Кодировка файла: UTF-8 (выгрузки WMS), либо cp1251 (выгрузки Excel в русской локали)"""
+        for encoding in ENCODINGS:
+            try:
+                codecs.getincrementaldecoder(encoding)().decode(sample)
+                return encoding
+            except UnicodeDecodeError:
+                pass
+        raise DataParsingError('Unknown encoding of csv-file')
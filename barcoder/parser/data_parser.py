@@ -0,0 +1,138 @@
+from abc import ABC, abstractmethod
+from array import array
+from typing import Any, Iterable, Sequence, Type
+from pathlib import Path
+
+from .typing import (
+    DocModel, ProductDocModel, BoxDocModel,
+    LabelType, Data, Dataset, RowNum
+)
+from .dataset import ColumnarDataset, INT_NULL, INT_MAX
+from barcoder.exceptions import DataParsingError
+
+__all__ = ['DataParser', 'parse_data_file']
+
+"""
+Общий интерфейс чтения табличных файлов с данными (Excel, CSV, Parquet и т.д.)
+"""
+
+Row = Sequence[Any]
+
+
+class DataParser(ABC):
+    """
+    Базовый парсер табличного файла с данными.
+    Наследник указывает расширения файлов (extensions=...) и реализует чтение строк <_read_rows>,
+    разбиение на корректные и некорректные данные - общее для всех форматов
+    """
+    _parsers: dict[str, Type['DataParser']] = {}
+
+    def __init_subclass__(cls, extensions: Sequence[str] = (), **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        DataParser._parsers.update({ext: cls for ext in extensions})
+
+    def __init__(self, file: Path | str, label_type: LabelType) -> None:
+        model = {LabelType.BOX: BoxDocModel,
+                 LabelType.PRODUCT: ProductDocModel}[label_type]
+        int_fields = {f for f, t in model.datamaker.__annotations__.items() if t is int}
+        fields = [(f, f in int_fields) for f in model.datamaker._fields]
+
+        correct_data = ColumnarDataset(model.datamaker)
+        correct_rows = array('q')
+        incorrect_data = ColumnarDataset(model.datamaker)
+        incorrenct_rows = array('q')
+        for row, values in self._read_rows(Path(file), model):
+            data: Data = model.datamaker(*(
+                self._normalize(v, is_int) for (_, is_int), v in zip(fields, values)
+            ))
+            if all(data):
+                correct_data.append(data)
+                correct_rows.append(row)
+            else:
+                incorrect_data.append(data)
+                incorrenct_rows.append(row)
+
+        if not (correct_data or incorrect_data):
+            raise DataParsingError('The file is empty or does not contain enough lines')
+
+        self.__colnames = tuple(model.columns.values())
+        self.__correct_data = correct_data
+        self.__correct_rows = correct_rows
+        self.__incorrect_data = incorrect_data
+        self.__incorrect_rows = incorrenct_rows
+
+    @classmethod
+    def supported_extensions(cls) -> Sequence[str]:
+        """Расширения файлов, для которых есть парсер"""
+        return tuple(cls._parsers)
+
+    @classmethod
+    def get_parser(cls, file: Path | str) -> Type['DataParser']:
+        """Парсер, соответствующий расширению файла"""
+        try:
+            return cls._parsers[Path(file).suffix.lower()]
+        except KeyError:
+            raise DataParsingError(f'Unsupported file type: {Path(file).suffix}')
+
+    @property
+    def colnames(self) -> Sequence[str]:
+        """Имена колонок с данными"""
+        return self.__colnames
+
+    @property
+    def correct_data(self) -> Dataset:
+        """Корректные данные (без пустых ячеек)"""
+        return self.__correct_data
+
+    @property
+    def correct_rows(self) -> Sequence[RowNum]:
+        """Номера рядов файла с корректными данными (по порядку correct_data)"""
+        return self.__correct_rows
+
+    @property
+    def incorrect_data(self) -> Dataset:
+        """Некоррктные данные (имеются пустные ячейки)"""
+        return self.__incorrect_data
+
+    @property
+    def incorrenct_rows(self) -> Sequence[RowNum]:
+        """Номера рядов с некорректными данными"""
+        return self.__incorrect_rows
+
+    @abstractmethod
+    def _read_rows(self, file: Path, model: Type[DocModel]) -> Iterable[tuple[RowNum, Row]]:
+        """
+        Чтение строк файла: (номер строки, значения колонок модели по порядку)
+        """
+
+    @staticmethod
+    def _normalize(value: Any, is_int: bool) -> Any:
+        """
+        Приведение значения ячейки к единому виду независимо от формата файла:
+        целочисленные поля - int, остальные - str, пустые значения - None
+        """
+        if isinstance(value, str):
+            value = value.strip() or None
+        if value is None:
+            return None
+
+        if is_int:
+            try:
+                number = float(value)
+                if not number.is_integer():
+                    return None
+                number = int(number)
+                return number if INT_NULL < number <= INT_MAX else None  # Вне int64 - некорректное значение
+            except (TypeError, ValueError, OverflowError):
+                return None
+
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)  # 4601234567890.0 -> '4601234567890'
+        return str(value)
+
+
+def parse_data_file(file: Path | str, label_type: LabelType) -> DataParser:
+    """
+    Собирает данные из файла парсером, соответствующим расширению файла
+    """
+    return DataParser.get_parser(file)(file, label_type)
@@ -0,0 +1,161 @@
+from array import array
+from collections.abc import Sequence
+from typing import Any, Iterable, Iterator, Optional, Type, Union
+
+from .typing import Data
+
+__all__ = ['ColumnarDataset']
+
+"""
+Компактное колоночное хранение данных для этикеток
+"""
+
+INT_NULL = -2 ** 63  # Значение пустой ячейки в целочисленной колонке
+INT_MAX = 2 ** 63 - 1
+
+
+class _IntColumn:
+    """Целочисленная колонка (кол-во, номер): массив int64"""
+    def __init__(self) -> None:
+        self.values = array('q')
+
+    def append(self, value: Optional[int]) -> None:
+        try:
+            self.values.append(INT_NULL if value is None else value)
+        except OverflowError:  # Вне int64 - как пустая ячейка
+            self.values.append(INT_NULL)
+
+    def get(self, i: int) -> Optional[int]:
+        value = self.values[i]
+        return None if value == INT_NULL else value
+
+
+class _StrColumn:
+    """
+    Строковая колонка с интернированием (артикул, наименование):
+    каждая уникальная строка хранится один раз, в колонке - ее индекс
+    """
+    def __init__(self) -> None:
+        self.indexes = array('I')
+        self.table: list[Optional[str]] = []
+        self._lookup: Optional[dict[Optional[str], int]] = {}
+
+    def append(self, value: Optional[str]) -> None:
+        if self._lookup is None:
+            self._lookup = {v: i for i, v in enumerate(self.table)}
+        if (index := self._lookup.get(value)) is None:
+            index = self._lookup[value] = len(self.table)
+            self.table.append(value)
+        self.indexes.append(index)
+
+    def get(self, i: int) -> Optional[str]:
+        return self.table[self.indexes[i]]
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {'indexes': self.indexes, 'table': self.table, '_lookup': None}
+
+
+class _PackedColumn:
+    """
+    Упакованная строковая колонка (ШК): все значения в одном буфере байт,
+    в колонке - смещение и длина значения (-1 - пустая ячейка)
+    """
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+        self.offsets = array('Q')
+        self.lengths = array('i')
+
+    def append(self, value: Union[str, int, None]) -> None:
+        self.offsets.append(len(self.buffer))
+        if value is None:
+            self.lengths.append(-1)
+            return
+        encoded = str(value).encode('utf8')
+        self.buffer += encoded
+        self.lengths.append(len(encoded))
+
+    def get(self, i: int) -> Optional[str]:
+        offset, length = self.offsets[i], self.lengths[i]
+        if length < 0:
+            return None
+        return self.buffer[offset:offset + length].decode('utf8')
+
+
+Column = Union[_IntColumn, _StrColumn, _PackedColumn]
+
+
+class ColumnarDataset(Sequence):
+    """
+    Набор данных для этикеток, хранящийся по колонкам:
+        целочисленные поля - массивы int64,
+        артикулы и наименования - интернированные строки,
+        ШК - упакованный буфер байт.
+    Индексация возвращает строку-представление (BoxData / ProductData),
+    срез - представление того же хранилища без копирования (дешевое разбиение на части)
+    """
+    def __init__(self, datamaker: Type[Data], rows: Iterable[Data] = ()) -> None:
+        self.datamaker = datamaker
+        self._columns: tuple[Column, ...] = tuple(
+            self._make_column(datamaker.__annotations__[field]) for field in datamaker._fields
+        )
+        self._size = 0
+        self._index: Optional[range] = None  # None - весь набор, иначе - представление части хранилища
+        self.extend(rows)
+
+    @staticmethod
+    def _make_column(annotation: Any) -> Column:
+        """int - числовая колонка, str - интернированные строки, прочее (ШК: str | int) - упакованная"""
+        if annotation is int:
+            return _IntColumn()
+        if annotation is str:
+            return _StrColumn()
+        return _PackedColumn()
+
+    def append(self, data: Data) -> None:
+        """Добавить строку (только для набора, не являющегося срезом)"""
+        if self._index is not None:
+            raise TypeError('Can not append to a slice of dataset')
+        for column, value in zip(self._columns, data):
+            column.append(value)
+        self._size += 1
+
+    def extend(self, rows: Iterable[Data]) -> None:
+        for data in rows:
+            self.append(data)
+
+    def chunks(self, size: int) -> Iterator['ColumnarDataset']:
+        """Разбиение на части по size строк (представления без копирования)"""
+        for start in range(0, len(self), size):
+            yield self[start:start + size]
+
+    def compact(self) -> 'ColumnarDataset':
+        """Копия, содержащая только строки этого набора (напр. для передачи среза в другой процесс)"""
+        return ColumnarDataset(self.datamaker, self)
+
+    def _row(self, i: int) -> Data:
+        return self.datamaker(*(column.get(i) for column in self._columns))
+
+    def __len__(self) -> int:
+        return self._size if self._index is None else len(self._index)
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[Data, 'ColumnarDataset']:
+        index = range(self._size) if self._index is None else self._index
+        if isinstance(i, slice):
+            view = ColumnarDataset.__new__(ColumnarDataset)
+            view.datamaker, view._columns, view._size = self.datamaker, self._columns, self._size
+            view._index = index[i]
+            return view
+        return self._row(index[i])
+
+    def __iter__(self) -> Iterator[Data]:
+        index = range(self._size) if self._index is None else self._index
+        return map(self._row, index)
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Срез передается (pickle) без остального хранилища
+        source = self if self._index is None else self.compact()
+        return {'datamaker': source.datamaker, '_columns': source._columns,
+                '_size': source._size, '_index': None}
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.datamaker.__name__}, rows={len(self)})'
@@ -1,27 +1,39 @@
-from typing import Any, Sequence
+from typing import Any, Optional, Sequence
 from pathlib import Path
-import yaml
 
 from .typing import (
     Label, LabelType, LabelSize, LabelQtyMode,
     LabelLayout, BoxLabelLayout, ProductLabelLayout,
     BarType, Font,
 )
+from .fonts_parser import parse_fonts
 from barcoder.exceptions import LayoutsParsingError, FontsParsingError
 
 __all__ = ['LayoutsParser']
 
+FileStamp = Optional[tuple[int, int]]
+
 
 class LayoutsParser:
     """
     Парсит директории с макетами этикеток и шрифтами,
-    и предоставляет удобный интерфейс получения информации о них
+    и предоставляет удобный интерфейс получения информации о них.
+    Повторный парсинг <refresh> затрагивает только измененные файлы,
+    некорректные файлы макетов не прерывают парсинг остальных (см. <errors>)
     """
-    def __init__(self, layouts_dir: Path | str, fonts: Sequence[Font]) -> None:
+    def __init__(self, layouts_dir: Path | str, fonts: Sequence[Font], fonts_dir: Path | str | None = None) -> None:
         self.layouts_dir = Path(layouts_dir)
+        self.fonts_dir = Path(fonts_dir) if fonts_dir is not None else None
         self._fonts = fonts
-        self._box_layouts = self._parse_layouts(LabelType.BOX)
-        self._product_layouts = self._parse_layouts(LabelType.PRODUCT)
+        self._fonts_stamp = self._dir_stamp(self.fonts_dir)
+        self._files: dict[Path, tuple[FileStamp, Label]] = {}  # Файл макета: (отметка изменения, этикетка)
+        self._errors: dict[Path, tuple[FileStamp, str]] = {}  # Некорректный файл: (отметка изменения, ошибка)
+        self._box_layouts: tuple[Label, ...] = ()
+        self._product_layouts: tuple[Label, ...] = ()
+
+        if not all(d.is_dir() for d in self.watched_dirs):
+            raise LayoutsParsingError('Check that label layout directories exist')
+        self.refresh()
 
     @property
     def box_labels(self) -> Sequence[Label]:
@@ -33,6 +45,22 @@ class LayoutsParser:
         """Список продуктовых этикеток"""
         return self._product_layouts
 
+    @property
+    def fonts(self) -> Sequence[Font]:
+        """Список шрифтов (обновляется при изменении директории шрифтов)"""
+        return self._fonts
+
+    @property
+    def errors(self) -> dict[Path, str]:
+        """Некорректные файлы макетов: (файл: описание ошибки)"""
+        return {f: err for f, (_, err) in self._errors.items()}
+
+    @property
+    def watched_dirs(self) -> Sequence[Path]:
+        """Директории, изменения в которых требуют повторного парсинга"""
+        dirs = [self.layouts_dir / t.name.lower() for t in LabelType]
+        return dirs + ([self.fonts_dir] if self.fonts_dir is not None else [])
+
     @property
     def types(self) -> Sequence[LabelType]:
         """Список всех возможных типов этикеток"""
@@ -50,21 +78,80 @@ class LayoutsParser:
         return {LabelType.BOX: self.box_labels,
                 LabelType.PRODUCT: self.product_labels}.get(label_type, [])
 
-    def _parse_layouts(self, label_type: LabelType) -> tuple[Label]:
+    def refresh(self) -> bool:
+        """
+        Повторный парсинг измененных, новых и удаленных файлов макетов.
+        При изменении директории шрифтов - шрифты и все макеты парсятся заново.
+        Возвращает True, если что-либо изменилось
         """
-        Парсинг пресетов этикеток
+        changed = False
+        if (fonts_stamp := self._dir_stamp(self.fonts_dir)) != self._fonts_stamp:
+            try:
+                self._fonts = parse_fonts(self.fonts_dir)
+            except FontsParsingError:
+                self._fonts = ()
+            self._fonts_stamp = fonts_stamp
+            self._files.clear()
+            self._errors.clear()
+            changed = True
+
+        self._box_layouts, box_changed = self._parse_layouts(LabelType.BOX)
+        self._product_layouts, product_changed = self._parse_layouts(LabelType.PRODUCT)
+        return changed or box_changed or product_changed
+
+    def _parse_layouts(self, label_type: LabelType) -> tuple[tuple[Label, ...], bool]:
         """
-        def load_label(fp: Path) -> Label:
-            return self._parse_file(yaml.safe_load(fp.open()), label_type)
+        Парсинг пресетов этикеток (только измененных с прошлого парсинга файлов).
+        Возвращает: (этикетки, были ли изменения)
+        """
+        import yaml
 
-        files = (self.layouts_dir / label_type.name.lower()).iterdir()
+        layouts_dir = self.layouts_dir / label_type.name.lower()
+        try:
+            files = sorted(f for f in layouts_dir.iterdir() if f.is_file() and f.suffix in ('.yaml', '.yml'))
+        except OSError:
+            files = []
+
+        changed = False
+        for f in set(self._files) | set(self._errors):  # Удаленные файлы
+            if f.parent == layouts_dir and f not in files:
+                self._files.pop(f, None)
+                self._errors.pop(f, None)
+                changed = True
+
+        for f in files:
+            stamp = self._file_stamp(f)
+            cached = self._files.get(f) or self._errors.get(f)
+            if cached is not None and cached[0] == stamp:
+                continue
+            changed = True
+            self._files.pop(f, None)
+            self._errors.pop(f, None)
+            try:
+                with f.open(encoding='utf8') as fp:
+                    self._files[f] = (stamp, self._parse_file(yaml.safe_load(fp), label_type))
+            except LayoutsParsingError as e:
+                self._errors[f] = (stamp, f'Check that fontname in layout file is correct: {e}')
+            except Exception as e:
+                self._errors[f] = (stamp, f'Check that label layout file is correct: {e}')
+
+        return tuple(self._files[f][1] for f in files if f in self._files), changed
+
+    @staticmethod
+    def _file_stamp(f: Path) -> FileStamp:
+        """Отметка изменения файла: (время изменения, размер)"""
         try:
-            return tuple(load_label(f) for f in files
-                         if f.is_file() and f.suffix in ('.yaml', '.yml'))
-        except FontsParsingError:
-            raise LayoutsParsingError('Check that fontname in layout files are correct')
-        except Exception:
-            raise LayoutsParsingError('Check that label layout files are correct')
+            st = f.stat()
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    @classmethod
+    def _dir_stamp(cls, d: Path | None) -> tuple[tuple[str, FileStamp], ...]:
+        """Отметка изменения директории: отметки всех ее файлов"""
+        if d is None or not d.is_dir():
+            return ()
+        return tuple((f.name, cls._file_stamp(f)) for f in sorted(d.iterdir()))
 
     def _parse_file(self, data: dict[str, Any], label_type: LabelType) -> Label:
         """Возвращает информацию для построения этикетки"""
@@ -0,0 +1,47 @@
+from typing import Iterable, Type
+from pathlib import Path
+
+from .typing import DocModel, RowNum
+from .data_parser import DataParser, Row
+from barcoder.exceptions import DataParsingError
+
+__all__ = ['ParquetParser']
+
+"""
+Собирает данные из Parquet/Arrow файла (колоночное чтение, только нужные колонки)
+"""
+
+class ParquetParser(DataParser, extensions=('.parquet', '.feather', '.arrow')):
+    """
+    Собирает данные из Parquet (Feather/Arrow IPC) документа в соответствии с типом этикетирования.
+    Колонки выбираются по номеру (как в Excel), заголовок хранится в схеме файла,
+    поэтому все строки файла - данные (нумерация с 1)
+    """
+    def _read_rows(self, file: Path, model: Type[DocModel]) -> Iterable[tuple[RowNum, Row]]:
+        try:
+            import pyarrow as pa
+            import pyarrow.feather as feather
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise DataParsingError('Package pyarrow is required to read parquet/arrow files')
+
+        try:
+            if file.suffix.lower() == '.parquet':
+                names = pq.read_schema(file).names
+                read_table = pq.read_table
+            else:
+                with pa.memory_map(str(file)) as source:
+                    names = pa.ipc.open_file(source).schema.names
+                read_table = feather.read_table
+
+            if len(names) < max(model.columns):
+                raise DataParsingError('The file does not contain enough columns')
+
+            table = read_table(file, columns=[names[col - 1] for col in model.columns])
+        except DataParsingError:
+            raise
+        except Exception as e:
+            raise DataParsingError(f"Can't read {file.suffix} file: {e}")
+
+        columns = [table.column(i).to_pylist() for i in range(table.num_columns)]
+        yield from enumerate(zip(*columns), start=1)
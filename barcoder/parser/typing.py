@@ -70,11 +70,20 @@ class BoxDocModel(DocModel):
 
 
 class BarType(Enum):
-    """Перечисление типов ШК, где значение (value) - BarName известное ReportLab"""
+    """
+    Перечисление типов ШК, где значение (value) - BarName известное ReportLab.
+    Двумерные (DataMatrix, QR) кодируются и отрисовываются приложением (barcoder.render.matrix)
+    """
     CODE128 = 'Code128'
     EAN13 = 'EAN13'
     UPCA = 'UPCA'
     EAN8 = 'EAN8'
+    DATAMATRIX = 'DataMatrix'
+    QR = 'QR'
+
+    @property
+    def is_2d(self) -> bool:
+        return self in (BarType.DATAMATRIX, BarType.QR)
 
 class Font(NamedTuple):
     """Именованный кортеж: (Имя шрифта, путь до него, размер шрифта)"""
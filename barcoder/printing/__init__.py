@@ -0,0 +1,3 @@
+from .dispatcher import *
+from .pages import *
+from .thread import *
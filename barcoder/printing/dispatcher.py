@@ -0,0 +1,200 @@
+import queue
+import socket
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterable, NamedTuple, Optional
+
+__all__ = ['Printer', 'DispatchReport', 'PrintDispatcher']
+
+"""
+Распределение заданий печати по пулу этикеточных принтеров (RAW, порт 9100)
+"""
+
+Job = tuple[int, bytes]  # (порядковый номер задания, данные для принтера)
+
+
+class Printer(NamedTuple):
+    """Сетевой принтер: (Имя, адрес, порт RAW-печати)"""
+    name: str
+    host: str
+    port: int = 9100
+
+
+class DispatchReport(NamedTuple):
+    """Итог печати: кол-во заданий, отправленных на каждый принтер, и номера неотправленных заданий"""
+    sent: dict[str, int]
+    failed: list[int]
+
+
+class _PrinterWorker(threading.Thread):
+    """
+    Поток отправки заданий на один принтер: постоянное соединение, ограниченная очередь,
+    повтор задания при ошибке (с переподключением) - порядок заданий на принтере сохраняется.
+    Если принтер так и не принял задание - он выбывает, а его задания возвращаются диспетчеру.
+    Протокол RAW не подтверждает печать: задание считается отправленным, когда передано в сокет
+    """
+    def __init__(self, printer: Printer, dispatcher: 'PrintDispatcher') -> None:
+        super().__init__(name=f'printer-{printer.name}', daemon=True)
+        self.printer = printer
+        self.dispatcher = dispatcher
+        self.queue: queue.Queue[Optional[Job]] = queue.Queue(maxsize=dispatcher.queue_size)
+        self.sock: Optional[socket.socket] = None
+        self.alive = True
+        self.assigned = 0  # Задания, поставленные в очередь и еще не завершенные (в т.ч. отправляемое)
+        self.sent = 0
+
+    @property
+    def load(self) -> int:
+        return self.assigned
+
+    def run(self):
+        cond = self.dispatcher.cond
+        try:
+            while (job := self.queue.get()) is not None:
+                with cond:
+                    cond.notify_all()  # В очереди освободилось место
+
+                ok = self._send(job[1])
+                with cond:
+                    if ok:
+                        self.sent += 1
+                        self.assigned -= 1
+                    else:
+                        self.alive = False
+                        self.dispatcher.orphans.append(job)
+                        while not self.queue.empty():
+                            if (rest := self.queue.get_nowait()) is not None:
+                                self.dispatcher.orphans.append(rest)
+                        self.assigned = 0  # Все задания возвращены диспетчеру
+                    cond.notify_all()
+                if not ok:
+                    return
+                self.dispatcher.job_done(job[0], self.printer)
+        finally:
+            self._close()
+
+    def _send(self, payload: bytes) -> bool:
+        d = self.dispatcher
+        for attempt in range(d.retries + 1):
+            try:
+                if self.sock is None:
+                    self.sock = d.connect((self.printer.host, self.printer.port), d.timeout)
+                self.sock.sendall(payload)
+                return True
+            except OSError:
+                self._close()
+                if attempt < d.retries:
+                    time.sleep(d.retry_delay * (attempt + 1))
+        return False
+
+    def _close(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+
+
+class PrintDispatcher:
+    """
+    Распределяет задания печати по принтерам: очередное задание уходит на наименее загруженный
+    работающий принтер со свободным местом в очереди. Задания выбывшего принтера переназначаются
+    """
+    def __init__(self,
+                 printers: Iterable[Printer],
+                 queue_size: int = 4,
+                 retries: int = 3,
+                 retry_delay: float = 1.0,
+                 timeout: float = 10.0,
+                 connect: Callable[..., socket.socket] = socket.create_connection) -> None:
+        self.printers = tuple(printers)
+        self.queue_size = queue_size
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self.connect = connect
+
+        self.cond = threading.Condition()
+        self.interrupted = False
+        self.orphans: deque[Job] = deque()
+        self.on_progress: Callable[[int, Printer], None] = lambda seq, printer: None
+
+    def interrupt(self):
+        """Прекратить раздачу заданий (уже поставленные в очереди принтеров будут отправлены)"""
+        with self.cond:
+            self.interrupted = True
+            self.cond.notify_all()
+
+    def job_done(self, seq: int, printer: Printer):
+        """Задание seq принято принтером (вызывается потоком принтера)"""
+        self.on_progress(seq, printer)
+
+    def dispatch(self,
+                 payloads: Iterable[bytes],
+                 on_progress: Optional[Callable[[int, Printer], None]] = None) -> DispatchReport:
+        """
+        Отправить задания на принтеры и дождаться завершения.
+        on_progress(номер задания, принтер) - вызывается из потоков принтеров
+        """
+        if on_progress is not None:
+            self.on_progress = on_progress
+        workers = [_PrinterWorker(p, self) for p in self.printers]
+        [w.start() for w in workers]
+
+        pending = enumerate(payloads)
+        failed: list[int] = []
+        job: Optional[Job] = None
+        try:
+            while True:
+                with self.cond:
+                    if self.interrupted:
+                        break
+                    if job is None and self.orphans:
+                        job = self.orphans.popleft()
+                if job is None:
+                    # Подготовка задания (чтение и нарезка PDF) - без блокировки: потоки принтеров не ждут
+                    job = next(pending, None)
+
+                with self.cond:
+                    if job is None:
+                        # Все задания розданы: ждем, пока принтеры их отправят (или вернут задания выбывших)
+                        self.cond.wait_for(lambda: self.orphans or self.interrupted
+                                           or not any(w.alive and w.load for w in workers))
+                        if self.orphans and not self.interrupted:
+                            continue
+                        break
+
+                    self.cond.wait_for(lambda: any(w.alive and not w.queue.full() for w in workers)
+                                       or not any(w.alive for w in workers) or self.interrupted)
+                    live = [w for w in workers if w.alive and not w.queue.full()]
+                    if not live or self.interrupted:  # Не осталось работающих принтеров или печать отменена
+                        break
+                    worker = min(live, key=lambda w: w.load)
+                    worker.assigned += 1  # Учитывается до постановки в очередь: загрузка не бывает занижена
+                    worker.queue.put_nowait(job)
+                    job = None
+        finally:
+            # Потоки принтеров останавливаются и при ошибке источника заданий (напр. чтения PDF)
+            self._stop(workers)
+
+        # Не отправленные задания: не розданные (отмена, отказ всех принтеров) и возвращенные выбывшими принтерами
+        if job is not None:
+            failed.append(job[0])
+        failed += [j[0] for j in self.orphans]
+        self.orphans.clear()
+        failed += [seq for seq, _ in pending]
+        return DispatchReport({w.printer.name: w.sent for w in workers}, sorted(failed))
+
+    @staticmethod
+    def _stop(workers: list[_PrinterWorker]):
+        """Завершение потоков принтеров: поставленные задания отправляются, затем закрывается соединение"""
+        for w in workers:
+            while w.is_alive():  # Очередь может быть заполнена: ждем места, пока поток работает
+                try:
+                    w.queue.put(None, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+        [w.join() for w in workers]
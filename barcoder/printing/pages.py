@@ -0,0 +1,43 @@
+from io import BytesIO
+from typing import Iterator
+
+from barcoder.exceptions import PrintError
+
+__all__ = ['pdf_jobs', 'count_pdf_jobs']
+
+"""
+Нарезка готового PDF с этикетками на задания печати (по pages_per_job страниц)
+"""
+
+
+def count_pdf_jobs(filepath: str, pages_per_job: int) -> int:
+    """Кол-во заданий печати, на которое будет нарезан PDF документ"""
+    from pypdf import PdfReader
+
+    try:
+        pages = len(PdfReader(filepath).pages)
+    except Exception:
+        raise PrintError(f'Не удалось прочитать PDF документ: {filepath}')
+    return -(-pages // pages_per_job)
+
+
+def pdf_jobs(filepath: str, pages_per_job: int) -> Iterator[bytes]:
+    """
+    Задания печати: PDF документы по pages_per_job страниц исходного документа (по порядку).
+    Нарезаются лениво - по мере отправки на принтеры
+    """
+    from pypdf import PdfReader, PdfWriter
+
+    try:
+        reader = PdfReader(filepath)
+        for start in range(0, len(reader.pages), pages_per_job):
+            writer = PdfWriter()
+            for page in reader.pages[start:start + pages_per_job]:
+                writer.add_page(page)
+            buf = BytesIO()
+            writer.write(buf)
+            yield buf.getvalue()
+    except PrintError:
+        raise
+    except Exception:
+        raise PrintError(f'Не удалось прочитать PDF документ: {filepath}')
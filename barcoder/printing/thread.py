@@ -0,0 +1,86 @@
+from typing import Sequence
+
+from PySide6.QtCore import Qt, QThread, Signal
+from PySide6.QtWidgets import QWidget
+from PySide6.QtWidgets import QProgressDialog as pd
+from PySide6.QtWidgets import QMessageBox as mb
+
+from barcoder.exceptions import PrintError
+
+from .dispatcher import Printer, PrintDispatcher, DispatchReport
+from .pages import pdf_jobs, count_pdf_jobs
+import config as conf
+
+__all__ = ['PrintThread']
+
+
+class PrintThread(QThread):
+    """
+    Фоновая отправка готового PDF с этикетками на пул принтеров (см. PrintDispatcher)
+    """
+    signal_progress = Signal(int)
+    signal_finish = Signal(object)
+    signal_error = Signal(str)
+
+    def __init__(self, parent: QWidget) -> None:
+        super().__init__(parent)
+        self.parent_window = parent
+        self.filepath = ''
+        self.sent = 0
+        self.dispatcher: PrintDispatcher
+        self.progress_dlg: pd
+
+        self.signal_progress.connect(self.update_progress)
+        self.signal_finish.connect(self.finish_print)
+        self.signal_error.connect(self.print_error)
+
+    def print_file(self, filepath: str, printers: Sequence[Printer]):
+        """Начать печать файла filepath"""
+        try:
+            jobs = count_pdf_jobs(filepath, conf.PRINT_PAGES_PER_JOB)
+        except PrintError as e:
+            return self.print_error(str(e))
+
+        self.filepath, self.sent = filepath, 0
+        self.dispatcher = PrintDispatcher(printers, queue_size=conf.PRINT_QUEUE_SIZE, retries=conf.PRINT_RETRIES)
+        self.progress_dlg = pd('Отправка на принтеры', 'Отмена', 0, jobs, self.parent_window)
+        self.progress_dlg.setWindowTitle('Печать этикеток')
+        self.progress_dlg.setWindowModality(Qt.WindowModal)
+        self.progress_dlg.canceled.connect(self.dispatcher.interrupt)  # pyright: ignore
+        self.start()
+
+    def run(self):
+        try:
+            report = self.dispatcher.dispatch(pdf_jobs(self.filepath, conf.PRINT_PAGES_PER_JOB),
+                                              on_progress=lambda seq, printer: self.signal_progress.emit(seq))
+        except PrintError as e:
+            self.dispatcher.interrupt()
+            self.signal_error.emit(str(e))
+            return
+        self.signal_finish.emit(report)
+
+    def update_progress(self, _seq: int):
+        """Обработка сигнала: очередное задание принято принтером"""
+        self.sent += 1
+        self.progress_dlg.setValue(self.sent)
+
+    def finish_print(self, report: DispatchReport):
+        """Обработка сигнала завершения печати"""
+        self.progress_dlg.close()
+        details = '\n'.join(f'{name}: {sent}' for name, sent in report.sent.items())
+        if report.failed:
+            msg = mb(mb.Warning, 'Внимание',
+                     f'Не отправлено заданий печати: {len(report.failed)} (по {conf.PRINT_PAGES_PER_JOB} стр.)',
+                     parent=self.parent_window)
+            msg.setDetailedText(f'Отправлено на принтеры:\n{details}\n\n'
+                                f'Не отправлены задания №: {", ".join(str(i + 1) for i in report.failed)}')
+        else:
+            msg = mb(mb.Information, 'Готово', 'Этикетки отправлены на печать', parent=self.parent_window)
+            msg.setDetailedText(f'Отправлено на принтеры:\n{details}')
+        msg.show()
+
+    def print_error(self, error: str):
+        """Обработка ошибки подготовки заданий печати"""
+        if hasattr(self, 'progress_dlg'):
+            self.progress_dlg.close()
+        mb(mb.Critical, 'Ошибка печати', error, parent=self.parent_window).show()
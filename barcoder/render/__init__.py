@@ -1 +1,25 @@
-from .thread import *
+from importlib import import_module
+from typing import Any
+
+"""
+Модули с Qt (потоки рендеринга и предпросмотра, очередь пакетной обработки) загружаются при первом обращении:
+процессы пакетной обработки импортируют только модули без Qt (worker, job, plan)
+"""
+
+_EXPORTS = {
+    'RenderThread': 'thread',
+    'PreviewRenderThread': 'preview',
+    'JobState': 'batch',
+    'BatchJob': 'batch',
+    'RenderQueue': 'batch',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,209 @@
+import multiprocessing as mp
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from enum import Enum
+from itertools import count
+from pathlib import Path
+from queue import Empty
+from typing import Any, Callable, Optional, Sequence
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from barcoder.parser import Dataset, Label, LabelType, LabelQtyMode, Font
+
+from .job import Progress
+from .worker import parse_file, render_file
+
+__all__ = ['JobState', 'BatchJob', 'RenderQueue']
+
+"""
+Пакетная обработка: очередь заданий (файл + этикетка), парсинг и рендеринг в пуле процессов
+"""
+
+POLL_MS = 100  # Период опроса состояния заданий в GUI
+
+
+class JobState(Enum):
+    """Состояние задания пакетной обработки"""
+    PARSING = 'Чтение файла'
+    QUEUED = 'В очереди'
+    RENDERING = 'Генерация'
+    DONE = 'Готово'
+    FAILED = 'Ошибка'
+    CANCELLED = 'Отменено'
+
+
+@dataclass(eq=False)
+class BatchJob:
+    """Задание пакетной обработки: файл с данными и параметры его этикеток"""
+    id: int
+    file: Path
+    output: Path
+    label: Label
+    label_type: LabelType
+    qty_mode: LabelQtyMode
+    fonts: Sequence[Font]
+    state: JobState = JobState.PARSING
+    total: int = 0
+    processed: int = 0
+    failed: int = 0
+    incorrect: int = 0
+    error: str = ''
+    dataset: Optional[Dataset] = field(default=None, repr=False)
+    rows: Optional[Sequence[int]] = field(default=None, repr=False)  # Номера рядов файла строк dataset
+    future: Optional[Future] = field(default=None, repr=False)
+
+    @property
+    def active(self) -> bool:
+        return self.state in (JobState.PARSING, JobState.QUEUED, JobState.RENDERING)
+
+
+class RenderQueue(QObject):
+    """
+    Очередь заданий пакетной обработки.
+    Файлы парсятся параллельно в пуле процессов сразу после добавления,
+    рендеринг - не более чем на workers процессах одновременно, в порядке очереди (приоритета)
+    """
+    signal_changed = Signal()
+
+    def __init__(self, workers: Optional[int] = None, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self.workers = workers or os.cpu_count() or 1
+        self.jobs: list[BatchJob] = []  # Порядок в списке - приоритет
+        self._ids = count(1)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._manager: Optional[Any] = None
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(POLL_MS)
+        self.timer.timeout.connect(self._poll)  # pyright: ignore
+
+    def enqueue(self,
+                file: Path,
+                output: Path,
+                label: Label,
+                label_type: LabelType,
+                qty_mode: LabelQtyMode,
+                fonts: Sequence[Font]) -> BatchJob:
+        """Добавить файл в очередь (парсинг начинается сразу)"""
+        job = BatchJob(next(self._ids), file, output, label, label_type, qty_mode, fonts)
+        job.future = self._submit(parse_file, file, label_type)
+        self.jobs.append(job)
+        self.timer.start()
+        self.signal_changed.emit()
+        return job
+
+    def move(self, job: BatchJob, offset: int):
+        """Изменить приоритет задания (сдвиг в очереди на offset позиций, отрицательный - выше)"""
+        i = self.jobs.index(job)
+        self.jobs.insert(max(0, min(len(self.jobs) - 1, i + offset)), self.jobs.pop(i))
+        self.signal_changed.emit()
+
+    def cancel(self, job: BatchJob):
+        """Отменить задание (рендеринг прерывается на ближайшей контрольной проверке)"""
+        if job.state is JobState.RENDERING:
+            self._cancelled[job.id] = True
+            return
+        if job.active:
+            if job.future is not None:
+                job.future.cancel()
+            job.state, job.future, job.dataset, job.rows = JobState.CANCELLED, None, None, None
+            self.signal_changed.emit()
+
+    def shutdown(self):
+        """Остановка пула процессов (при выходе из приложения)"""
+        for job in self.jobs:
+            if job.active:
+                self.cancel(job)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def _start_pool(self):
+        ctx = mp.get_context('spawn')  # Одинаково на всех ОС, без копирования состояния Qt в процессы
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=ctx)
+        if self._manager is None:
+            self._manager = ctx.Manager()
+            self._events = self._manager.Queue()
+            self._cancelled = self._manager.dict()
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """
+        Отправить задачу в пул процессов. Пул, сломанный аварийным завершением процесса
+        (задачи которого завершились с ошибкой BrokenProcessPool), пересоздается
+        """
+        self._start_pool()
+        try:
+            return self._pool.submit(fn, *args)  # pyright: ignore
+        except BrokenProcessPool:
+            self._pool.shutdown(wait=False, cancel_futures=True)  # pyright: ignore
+            self._pool = None
+            self._start_pool()
+            return self._pool.submit(fn, *args)  # pyright: ignore
+
+    def _poll(self):
+        """Опрос: прогресс рендеринга, завершенные этапы, запуск рендеринга в свободных процессах"""
+        changed = False
+        try:
+            while True:
+                job_id, processed = self._events.get_nowait()
+                for job in self.jobs:
+                    if job.id == job_id and job.state is JobState.RENDERING:
+                        job.processed, changed = processed, True
+        except Empty:
+            pass
+
+        for job in self.jobs:
+            if job.future is not None and job.future.done():
+                self._finish_stage(job)
+                changed = True
+
+        running = sum(job.state is JobState.RENDERING for job in self.jobs)
+        for job in self.jobs:
+            if running >= self.workers:
+                break
+            if job.state is JobState.QUEUED:
+                job.state = JobState.RENDERING
+                job.future = self._submit(
+                    render_file, job.id, job.dataset, job.output, job.label, job.label_type,
+                    job.qty_mode, job.fonts, job.rows, self._events, self._cancelled
+                )
+                running += 1
+                changed = True
+
+        if not any(job.active for job in self.jobs):
+            self.timer.stop()
+        if changed:
+            self.signal_changed.emit()
+
+    def _finish_stage(self, job: BatchJob):
+        """Обработка завершения этапа задания (парсинг или рендеринг)"""
+        future, job.future = job.future, None
+        try:
+            result = future.result()  # pyright: ignore
+        except Exception as e:
+            job.state, job.error, job.dataset, job.rows = JobState.FAILED, str(e) or type(e).__name__, None, None
+            return
+
+        if job.state is JobState.PARSING:
+            job.dataset, job.rows, job.incorrect = result
+            job.total = len(job.dataset)
+            job.state = JobState.QUEUED if job.total else JobState.FAILED
+            job.error = '' if job.total else 'Нет корректных данных'
+
+        elif job.state is JobState.RENDERING:
+            progress: Progress = result
+            job.processed, job.failed, job.dataset, job.rows = progress.processed, progress.failed, None, None
+            self._cancelled.pop(job.id, None)
+            if progress.interrupted:
+                job.state = JobState.CANCELLED
+            elif progress.failure:
+                job.state, job.error = JobState.FAILED, progress.error or 'Не удалось сохранить файл'
+            else:
+                job.state = JobState.DONE
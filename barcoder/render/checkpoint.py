@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+from barcoder.parser import Dataset, Label, LabelType, LabelQtyMode
+from barcoder.exceptions import RenderSaveError
+
+__all__ = ['RenderCheckpoint']
+
+"""
+Контрольные точки рендеринга: готовые части PDF и журнал обработанных строк.
+Позволяют продолжить прерванную генерацию (отмена, сбой, сон ноутбука) с последней контрольной точки
+"""
+
+JOURNAL_VERSION = 1
+JOURNAL_FILENAME = 'journal.json'
+JOURNAL_TMP = 'journal.tmp'  # Запись журнала: временный файл, затем атомарная замена
+PART_PATTERN = 'part-*.pdf'
+
+
+class RenderCheckpoint:
+    """
+    Журнал рендеринга в директории <файл.pdf>.parts:
+        отпечаток задания (данные, этикетка, тип, кол-ый режим),
+        список готовых частей - файл части, диапазон строк набора данных и номера строк с ошибками.
+    Части всегда нарезаются от начала набора данных по rows_per_part строк,
+    поэтому возобновленное задание дает тот же итоговый файл, что и непрерывное
+    """
+    def __init__(self, filepath: str, fingerprint: str, rows_per_part: int) -> None:
+        self.filepath = Path(filepath)
+        self.dir = self.filepath.with_name(self.filepath.name + '.parts')
+        self.fingerprint = fingerprint
+        self.rows_per_part = rows_per_part
+        self.parts: list[dict[str, Any]] = self._load()
+
+    @property
+    def processed(self) -> int:
+        """Кол-во строк набора данных, обработанных в сохраненных частях"""
+        return self.parts[-1]['stop'] if self.parts else 0
+
+    @property
+    def failed_rows(self) -> Sequence[int]:
+        """Индексы строк (в наборе данных) с ошибками отрисовки в сохраненных частях"""
+        return [i for part in self.parts for i in part['failed']]
+
+    def part_path(self, start: int) -> Path:
+        """Путь к файлу части, начинающейся со строки start (директория контрольных точек создается)"""
+        try:
+            self.dir.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            raise RenderSaveError('Не удалось создать директорию контрольных точек')
+        return self.dir / f'part-{start:08d}.pdf'
+
+    def commit(self, start: int, stop: int, failed: Sequence[int], has_pages: bool = True) -> None:
+        """Зафиксировать готовую часть (строки start..stop) в журнале"""
+        self.parts += [{'file': self.part_path(start).name if has_pages else None,
+                        'start': start, 'stop': stop, 'failed': list(failed)}]
+        journal = self.dir / JOURNAL_FILENAME
+        tmp = self.dir / JOURNAL_TMP
+        tmp.write_text(json.dumps({
+            'version': JOURNAL_VERSION,
+            'fingerprint': self.fingerprint,
+            'rows_per_part': self.rows_per_part,
+            'parts': self.parts,
+        }), encoding='utf8')
+        os.replace(tmp, journal)  # Атомарная замена: журнал не бывает записан наполовину
+
+    def merge(self) -> None:
+        """Собрать итоговый PDF из частей и удалить контрольные точки"""
+        from pypdf import PdfWriter
+
+        try:
+            writer = PdfWriter()
+            for part in self.parts:
+                if part['file'] is not None:
+                    writer.append(str(self.dir / part['file']))
+            with self.filepath.open('wb') as f:
+                writer.write(f)
+        except Exception:
+            raise RenderSaveError('Ошибка при сборке PDF документа из частей')
+        self.clear()
+
+    def clear(self) -> None:
+        """Удалить контрольные точки (посторонние файлы в директории не удаляются)"""
+        try:
+            self._remove()
+        except (RenderSaveError, OSError):
+            pass  # Итоговый PDF уже собран: оставшиеся файлы не мешают
+        self.parts = []
+
+    def _own_file(self, path: Path) -> bool:
+        """Файл создан контрольными точками: журнал (или его временная копия) и части PDF"""
+        return path.is_file() and (path.name in (JOURNAL_FILENAME, JOURNAL_TMP) or path.match(PART_PATTERN))
+
+    def _remove(self) -> None:
+        """
+        Удалить файлы контрольных точек и директорию.
+        Директория с посторонними файлами (созданная не приложением) не удаляется - RenderSaveError
+        """
+        if not self.dir.exists():
+            return
+        if not self.dir.is_dir() or not all(self._own_file(path) for path in self.dir.iterdir()):
+            raise RenderSaveError(f'{self.dir} уже существует и создан не приложением: '
+                                  'переименуйте или удалите его, либо выберите другое имя файла')
+        for path in self.dir.iterdir():
+            path.unlink(missing_ok=True)
+        self.dir.rmdir()
+
+    def _load(self) -> list[dict[str, Any]]:
+        """
+        Готовые части из журнала предыдущего запуска.
+        Журнал другого задания (или поврежденный) - удаляется, рендеринг начинается с начала.
+        RenderSaveError - директория контрольных точек занята посторонними файлами
+        """
+        try:
+            journal = json.loads((self.dir / JOURNAL_FILENAME).read_text(encoding='utf8'))
+            if (journal['version'], journal['fingerprint'], journal['rows_per_part']) == \
+                    (JOURNAL_VERSION, self.fingerprint, self.rows_per_part) and \
+                    all(p['file'] is None or (self.dir / p['file']).is_file() for p in journal['parts']):
+                return journal['parts']
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        try:
+            self._remove()
+        except OSError:
+            raise RenderSaveError(f'Не удалось удалить устаревшие контрольные точки: {self.dir}')
+        return []
+
+    @staticmethod
+    def make_fingerprint(dataset: Dataset,
+                         label: Label,
+                         label_type: LabelType,
+                         qty_mode: LabelQtyMode,
+                         extra: Optional[str] = None) -> str:
+        """Отпечаток задания: хэш данных и параметров отрисовки"""
+        h = hashlib.sha256(repr((label, label_type, qty_mode, extra)).encode('utf8'))
+        for data in dataset:
+            h.update('\x1f'.join(map(str, data)).encode('utf8') + b'\x1e')
+        return h.hexdigest()
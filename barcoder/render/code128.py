@@ -0,0 +1,160 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, Optional
+
+if TYPE_CHECKING:  # ReportLab импортируется только при старте рендеринга
+    from reportlab.pdfgen.canvas import Canvas
+
+__all__ = ['Code128Symbol', 'encode_code128', 'code128_widths', 'encode_many']
+
+"""
+Code128: табличное кодирование с оптимальным выбором наборов A/B/C (минимум символов),
+ширины элементов в модулях (кэшируются по значению) и отрисовка полос одним путем
+"""
+
+CACHE_SIZE = 4096  # Кол-во закодированных значений в кэше
+QUIET_MIN = 18.0  # Мин. свободная зона (pt): 1/4 дюйма, как у ReportLab
+
+# Ширины элементов символов 0..106 (полоса, пробел, полоса, ...) в модулях. 106 - стоп (7 элементов)
+PATTERNS = (
+    '212222', '222122', '222221', '121223', '121322', '131222', '122213', '122312', '132212',
+    '221213', '221312', '231212', '112232', '122132', '122231', '113222', '123122', '123221',
+    '223211', '221132', '221231', '213212', '223112', '312131', '311222', '321122', '321221',
+    '312212', '322112', '322211', '212123', '212321', '232121', '111323', '131123', '131321',
+    '112313', '132113', '132311', '211313', '231113', '231311', '112133', '112331', '132131',
+    '113123', '113321', '133121', '313121', '211331', '231131', '213113', '213311', '213131',
+    '311123', '311321', '331121', '312113', '312311', '332111', '314111', '221411', '431111',
+    '111224', '111422', '121124', '121421', '141122', '141221', '112214', '112412', '122114',
+    '122411', '142112', '142211', '241211', '221114', '413111', '241112', '134111', '111242',
+    '121142', '121241', '114212', '124112', '124211', '411212', '421112', '421211', '212141',
+    '214121', '412121', '111143', '111341', '131141', '114113', '114311', '411113', '411311',
+    '113141', '114131', '311141', '411131', '211412', '211214', '211232', '2331112',
+)
+WIDTHS = tuple(bytes(int(w) for w in p) for p in PATTERNS)
+
+B, A, C = 0, 1, 2  # Наборы (порядок - предпочтение при равной длине)
+START = (104, 103, 105)
+SWITCH = (100, 101, 99)  # Смена набора: в B, A, C
+SHIFT, STOP = 98, 106
+# Функциональные символы (как в ReportLab: '\xf1'..'\xf4'): значения в наборах B, A
+FNC = {'\xf1': (102, 102), '\xf2': (97, 97), '\xf3': (96, 96), '\xf4': (100, 101)}
+INFINITY = 1 << 30
+
+Step = tuple[int, int, tuple[int, ...]]  # Предыдущая позиция, предыдущий набор, коды шага
+
+
+def _values(char: str) -> tuple[Optional[int], Optional[int]]:
+    """Значения символа в наборах B и A (None - символа нет в наборе)"""
+    if char in FNC:
+        return FNC[char]
+    code = ord(char)
+    return (code - 32 if 32 <= code < 128 else None,
+            code - 32 if 32 <= code < 96 else code + 64 if code < 32 else None)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def encode_code128(value: str) -> tuple[int, ...]:
+    """Кодовые символы: старт, данные, контрольный символ, стоп (минимальное кол-во символов)"""
+    if not value:
+        raise ValueError('Пустое значение Code128')
+    if len(value) % 2 == 0 and value.isascii() and value.isdigit():  # Частый случай: весь набор C
+        codes = [START[C], *(int(value[i:i + 2]) for i in range(0, len(value), 2))]
+    else:
+        codes = _encode_optimal(value)
+    checksum = (codes[0] + sum(k * v for k, v in enumerate(codes[1:], 1))) % 103
+    return (*codes, checksum, STOP)
+
+
+def _encode_optimal(value: str) -> list[int]:
+    """
+    Выбор наборов динамическим программированием по позициям значения: минимум символов
+    с учетом смены набора, SHIFT (один символ другого из наборов A/B) и пар цифр набора C
+    """
+    n = len(value)
+    cost = [[INFINITY] * 3 for _ in range(n + 1)]  # Мин. кол-во символов для value[:i], набор в конце
+    back: list[list[Optional[Step]]] = [[None] * 3 for _ in range(n + 1)]
+    cost[0] = [1, 1, 1]
+    back[0] = [(0, -1, (START[s],)) for s in (B, A, C)]
+
+    def relax(i: int, code_set: int, total: int, step: Step):
+        if total < cost[i][code_set]:
+            cost[i][code_set], back[i][code_set] = total, step
+
+    for i in range(n + 1):
+        reached = cost[i][:]  # Смена набора в позиции i (двойная смена не бывает выгоднее одной)
+        for s in (B, A, C):
+            for t in (B, A, C):
+                if t != s:
+                    relax(i, t, reached[s] + 1, (i, s, (SWITCH[t],)))
+        if i == n:
+            break
+        char = value[i]
+        vb, va = _values(char)
+        for s, v, other in ((B, vb, va), (A, va, vb)):
+            if v is not None:
+                relax(i + 1, s, cost[i][s] + 1, (i, s, (v,)))
+            elif other is not None and char not in FNC:
+                relax(i + 1, s, cost[i][s] + 2, (i, s, (SHIFT, other)))
+        if '0' <= char <= '9' and i + 1 < n and '0' <= value[i + 1] <= '9':
+            relax(i + 2, C, cost[i][C] + 1, (i, C, (int(value[i:i + 2]),)))
+        elif char == '\xf1':
+            relax(i + 1, C, cost[i][C] + 1, (i, C, (102,)))
+
+    code_set = min((B, A, C), key=lambda s: cost[n][s])
+    if cost[n][code_set] >= INFINITY:
+        raise ValueError(f'Значение не кодируется в Code128: {value!r}')
+    codes: list[int] = []
+    i = n
+    while code_set >= 0:
+        i, code_set, step = back[i][code_set]  # pyright: ignore
+        codes[:0] = step
+    return codes
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def code128_widths(value: str) -> bytes:
+    """Ширины элементов символа в модулях (полоса, пробел, ...), без свободных зон"""
+    return b''.join(WIDTHS[code] for code in encode_code128(value))
+
+
+def encode_many(values: Iterable[str]) -> list[Optional[bytes]]:
+    """
+    Кодирование столбца значений: каждое уникальное значение кодируется один раз.
+    None - значение не кодируется в Code128
+    """
+    values = list(values)
+    encoded: dict[str, Optional[bytes]] = {}
+    for value in dict.fromkeys(values):
+        try:
+            encoded[value] = code128_widths(value)
+        except ValueError:
+            encoded[value] = None
+    return [encoded[value] for value in values]
+
+
+class Code128Symbol:
+    """
+    Code128, готовый к отрисовке (аналог Drawing: width, height, drawOn).
+    Геометрия как у ReportLab: модуль bar_width (pt), свободные зоны - max(1/4 дюйма, 10 модулей).
+    widths - уже закодированное значение (см. encode_many)
+    """
+    def __init__(self, value: str, bar_width: float, bar_height: float, widths: Optional[bytes] = None) -> None:
+        self.widths = code128_widths(value) if widths is None else widths
+        self.bar_width = bar_width
+        self.quiet = max(QUIET_MIN, 10 * bar_width)
+        self.width = 2 * self.quiet + sum(self.widths) * bar_width
+        self.height = bar_height
+
+    def drawOn(self, canvas: 'Canvas', x: float, y: float):
+        """Отрисовка одним путем: полосы - прямоугольники в единицах модуля"""
+        canvas.saveState()
+        canvas.translate(x + self.quiet, y)
+        canvas.scale(self.bar_width, 1)
+        canvas.setFillColorRGB(0, 0, 0)
+        path = canvas.beginPath()
+        position = 0
+        for n, width in enumerate(self.widths):
+            if n % 2 == 0:  # Полосы - на четных местах
+                path.rect(position, 0, width, self.height)
+            position += width
+        canvas.drawPath(path, stroke=0, fill=1)
+        canvas.restoreState()
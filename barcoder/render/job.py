@@ -0,0 +1,186 @@
+import csv
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import monotonic
+from typing import Callable, Optional, Sequence
+
+from barcoder.parser import BarType, Data, Dataset, Label, LabelType, LabelQtyMode, Font
+from barcoder.exceptions import RenderDrawError, RenderSaveError
+
+from .checkpoint import RenderCheckpoint
+from .code128 import encode_many
+from .optimize import configured_options
+from .plan import make_plan
+import config as conf
+
+__all__ = ['Progress', 'RenderJob']
+
+"""
+Задание рендеринга набора данных в PDF (без привязки к GUI):
+используется потоком рендеринга главного окна и процессами пакетной обработки
+"""
+
+PROGRESS_INTERVAL = 0.1  # Мин. интервал (сек.) между сообщениями о прогрессе
+REPORT_ROW_COLUMN = 'row'  # Колонка отчета с номером ряда файла
+FAILED_DATA_LIMIT = 50  # Кол-во строк с ошибками в сводке прогресса (полный список - в отчете)
+
+
+@dataclass
+class Progress:
+    processed: int = 0
+    successed: int = 0
+    failed: int = 0
+    failed_data: list[Data] = field(default_factory=list)  # Первые FAILED_DATA_LIMIT строк с ошибками
+    report: Optional[str] = None  # Отчет со всеми строками с ошибками (CSV рядом с PDF)
+    interrupted: bool = False
+    failure: bool = False
+    error: Optional[str] = None  # Причина сбоя (если известна)
+
+
+class RenderJob:
+    """
+    Рендеринг набора данных в PDF частями с контрольными точками (см. RenderCheckpoint)
+    """
+    def __init__(self,
+                 dataset: Dataset,
+                 filepath: str,
+                 label: Label,
+                 label_type: LabelType,
+                 qty_mode: LabelQtyMode,
+                 fonts: Sequence[Font],
+                 rows: Optional[Sequence[int]] = None) -> None:
+        """rows - номера рядов файла строк dataset (для отчета об ошибках), иначе - номера строк dataset с 1"""
+        self.plan = make_plan(dataset, qty_mode, group=conf.RENDER_GROUP_REPEATS)
+        self.dataset = self.plan.dataset  # Строки в порядке отрисовки (см. RenderPlan)
+        self.rows = rows
+        self.filepath = filepath
+        self.label = label
+        self.label_type = label_type
+        self.qty_mode = qty_mode
+        self.fonts = fonts
+        self.options = configured_options()
+        self.progress = Progress()
+
+    def interrupt(self):
+        self.progress.interrupted = True
+
+    def run(self,
+            on_progress: Callable[[Progress], None] = lambda p: None,
+            interval: float = PROGRESS_INTERVAL) -> Progress:
+        """
+        Рендеринг с продолжением с последней контрольной точки.
+        on_progress - вызывается не чаще раза в interval сек. (а также в начале и в конце рендеринга)
+        """
+        from .render import RenderLabel  # ReportLab импортируется только при старте рендеринга
+
+        dataset, rows = self.dataset, conf.RENDER_CHECKPOINT_ROWS
+        self.on_progress, self.interval, self.last_progress = on_progress, interval, monotonic()
+        fingerprint = RenderCheckpoint.make_fingerprint(dataset, self.label, self.label_type, self.qty_mode,
+                                                        extra=repr(self.options))
+        try:
+            self.checkpoint = RenderCheckpoint(self.filepath, fingerprint, rows)
+        except RenderSaveError as e:
+            self.progress.failure, self.progress.error = True, str(e)
+            on_progress(self.progress)
+            return self.progress
+        # Продолжение прерванного задания с последней контрольной точки
+        resumed = self.checkpoint.processed
+        failed_rows = self.checkpoint.failed_rows
+        self.progress.processed = resumed
+        self.progress.failed = len(failed_rows)
+        self.progress.successed = resumed - len(failed_rows)
+        self.progress.failed_data = [dataset[i] for i in failed_rows[:FAILED_DATA_LIMIT]]
+        on_progress(self.progress)
+
+        for start in range(resumed, len(dataset), rows):
+            if self.progress.interrupted or self.progress.failure:
+                break
+            stop = min(start + rows, len(dataset))
+            try:
+                part = str(self.checkpoint.part_path(start))
+            except RenderSaveError:
+                self.progress.failure = True
+                break
+            self.render = RenderLabel(part, self.label, self.label_type, self.qty_mode, self.fonts, self.options,
+                                      self.plan.repeated, self._encode_code128(start, stop))
+            failed = [i for i in range(start, stop)
+                      if not self.progress.interrupted and not self._draw(dataset[i])]
+            if not self.progress.interrupted:
+                self._save_part(start, stop, failed)
+        self._save()
+        on_progress(self.progress)
+        return self.progress
+
+    def _encode_code128(self, start: int, stop: int) -> dict[str, bytes]:
+        """
+        Кодирование столбца ШК части (строки start..stop) собственным кодировщиком Code128 до отрисовки,
+        вне блокировки ReportLab: каждое уникальное значение кодируется один раз (см. encode_many)
+        """
+        if self.options is None or not self.options.table_code128:
+            return {}
+        from .render import RenderLabel
+
+        layouts = self.label.layouts
+        values = [str(data.barcode) for data in map(self.dataset.__getitem__, range(start, stop))
+                  if RenderLabel.label_bar_type(self.label_type, layouts, data.barcode) is BarType.CODE128]
+        return {value: widths for value, widths in zip(values, encode_many(values)) if widths is not None}
+
+    def _draw(self, data: Data) -> bool:
+        """Попытка отрисовки очередной этикетки. Возвращает True или False в зависимости от успеха"""
+        try:
+            self.render.draw(data)
+            self.progress.successed += 1
+            return True
+        except RenderDrawError:
+            self.progress.failed += 1
+            if len(self.progress.failed_data) < FAILED_DATA_LIMIT:
+                self.progress.failed_data += [data]
+            return False
+        finally:
+            self.progress.processed += 1
+            if monotonic() - self.last_progress >= self.interval:
+                self.last_progress = monotonic()
+                self.on_progress(self.progress)
+
+    def _save_part(self, start: int, stop: int, failed: Sequence[int]):
+        """Попытка сохранить часть PDF документа и зафиксировать ее в журнале (контрольная точка)"""
+        try:
+            if self.render.pages:
+                self.render.save()
+            self.checkpoint.commit(start, stop, failed, has_pages=bool(self.render.pages))
+        except (RenderSaveError, OSError):
+            self.progress.failure = True
+
+    def _save(self):
+        """Попытка собрать итоговый PDF документ из частей и записать отчет о строках с ошибками"""
+        if not (self.progress.interrupted or self.progress.failure):
+            failed_rows = self.checkpoint.failed_rows
+            try:
+                self.checkpoint.merge()
+            except RenderSaveError:
+                self.progress.failure = True
+                return
+            self.progress.report = self._write_report(failed_rows)
+
+    def _write_report(self, failed_rows: Sequence[int]) -> Optional[str]:
+        """
+        Отчет (CSV рядом с PDF) со всеми строками, для которых не созданы этикетки.
+        Без ошибок - отчет предыдущей генерации удаляется. Возвращает путь к отчету, если он записан
+        """
+        report = Path(self.filepath).with_suffix('.errors.csv')
+        try:
+            if not failed_rows:
+                report.unlink(missing_ok=True)
+                return None
+            with report.open('w', encoding='utf-8-sig', newline='') as f:  # BOM - для Excel
+                writer = csv.writer(f, delimiter=';')
+                writer.writerow((REPORT_ROW_COLUMN, *self.dataset[failed_rows[0]]._fields))
+                writer.writerows((self._source_row(i), *self.dataset[i]) for i in failed_rows)
+        except OSError:
+            return None  # Отчет необязателен: PDF уже создан
+        return str(report)
+
+    def _source_row(self, i: int) -> int:
+        """Номер ряда файла (или строки исходного набора данных) для строки i в порядке отрисовки"""
+        source = self.plan.source_index(i)
+        return self.rows[source] if self.rows is not None else source + 1
@@ -0,0 +1,286 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING, Sequence
+
+from barcoder.parser import BarType
+
+if TYPE_CHECKING:  # ReportLab импортируется только при старте рендеринга
+    from reportlab.pdfgen.canvas import Canvas
+
+__all__ = ['MatrixSymbol', 'symbol_rects', 'encode_datamatrix', 'encode_qr', 'matrix_rects', 'is_gs1']
+
+"""
+Двумерные ШК (DataMatrix ECC200, QR): кодирование в матрицу модулей и отрисовка.
+Матрицы кэшируются по значению, модули отрисовываются объединенными прямоугольниками
+"""
+
+Matrix = tuple[tuple[bool, ...], ...]  # Матрица модулей символа (True - темный), строки сверху вниз
+Rects = tuple[tuple[int, int, int, int], ...]  # Прямоугольники (x, y, ширина, высота) в модулях, y - снизу
+
+CACHE_SIZE = 4096  # Кол-во закодированных значений в кэше
+GS = '\x1d'  # Разделитель полей GS1 (коды маркировки "Честный знак")
+FNC1 = 232
+
+# Размеры квадратных символов ECC200:
+# (размер, размер области данных, кол-во кодовых слов данных, кол-во слов коррекции, кол-во блоков)
+DATAMATRIX_SIZES = (
+    (10, 8, 3, 5, 1), (12, 10, 5, 7, 1), (14, 12, 8, 10, 1), (16, 14, 12, 12, 1),
+    (18, 16, 18, 14, 1), (20, 18, 22, 18, 1), (22, 20, 30, 20, 1), (24, 22, 36, 24, 1),
+    (26, 24, 44, 28, 1), (32, 14, 62, 36, 1), (36, 16, 86, 42, 1), (40, 18, 114, 48, 1),
+    (44, 20, 144, 56, 1), (48, 22, 174, 68, 1), (52, 24, 204, 84, 2), (64, 14, 280, 112, 2),
+    (72, 16, 368, 144, 4), (80, 18, 456, 192, 4), (88, 20, 576, 224, 4), (96, 22, 696, 272, 4),
+    (104, 24, 816, 336, 6), (120, 18, 1050, 408, 6), (132, 20, 1304, 496, 8), (144, 22, 1558, 620, 10),
+)
+
+
+class MatrixSymbol:
+    """
+    Двумерный ШК, готовый к отрисовке (аналог Drawing линейных ШК: width, height, drawOn).
+    Размер модуля - module (pt), но не больше, чем позволяет max_size (pt) для символа целиком.
+    Свободная зона - 1 модуль для DataMatrix, 4 для QR
+    """
+    def __init__(self, bar_type: BarType, value: str, module: float, max_size: float) -> None:
+        size, self.rects = symbol_rects(bar_type, value)
+        self.quiet = 1 if bar_type is BarType.DATAMATRIX else 4
+        modules = size + 2 * self.quiet
+        self.module = min(module, max_size / modules)
+        self.width = self.height = modules * self.module
+
+    def drawOn(self, canvas: 'Canvas', x: float, y: float):
+        """Отрисовка одним путем: объединенные прямоугольники в единицах модуля"""
+        canvas.saveState()
+        canvas.translate(x + self.quiet * self.module, y + self.quiet * self.module)
+        canvas.scale(self.module, self.module)
+        canvas.setFillColorRGB(0, 0, 0)
+        path = canvas.beginPath()
+        for rect in self.rects:
+            path.rect(*rect)
+        canvas.drawPath(path, stroke=0, fill=1)
+        canvas.restoreState()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def symbol_rects(bar_type: BarType, value: str) -> tuple[int, Rects]:
+    """Кодирование значения (с кэшем). Возвращает: (размер символа в модулях, прямоугольники модулей)"""
+    matrix = encode_datamatrix(value) if bar_type is BarType.DATAMATRIX else encode_qr(value)
+    return len(matrix), matrix_rects(matrix)
+
+
+def matrix_rects(matrix: Matrix) -> Rects:
+    """
+    Объединение темных модулей в прямоугольники: горизонтальные серии модулей,
+    одинаковые серии соседних строк - в один прямоугольник
+    """
+    rows = len(matrix)
+    open_runs: dict[tuple[int, int], list[int]] = {}  # (x, ширина) -> [y нижней строки, высота]
+    rects: list[tuple[int, int, int, int]] = []
+    for r, row in enumerate(matrix):
+        y = rows - 1 - r
+        runs, x = set(), 0
+        while x < len(row):
+            if row[x]:
+                start = x
+                while x < len(row) and row[x]:
+                    x += 1
+                runs.add((start, x - start))
+            x += 1
+        for run in list(open_runs):
+            if run not in runs:
+                y0, h = open_runs.pop(run)
+                rects.append((run[0], y0, run[1], h))
+        for run in runs:
+            if run in open_runs:
+                open_runs[run] = [y, open_runs[run][1] + 1]
+            else:
+                open_runs[run] = [y, 1]
+    rects += [(run[0], y0, run[1], h) for run, (y0, h) in open_runs.items()]
+    return tuple(sorted(rects, key=lambda r: (-r[1] - r[3], r[0])))
+
+
+def encode_qr(value: str) -> Matrix:
+    """Кодирование в матрицу QR (уровень коррекции M, версия - минимальная)"""
+    from reportlab.graphics.barcode.qrencoder import QRCode, QRErrorCorrectLevel
+
+    qr = QRCode(None, QRErrorCorrectLevel.M)
+    qr.addData(value)
+    qr.make()
+    n = qr.getModuleCount()
+    return tuple(tuple(bool(qr.isDark(r, c)) for c in range(n)) for r in range(n))
+
+
+def encode_datamatrix(value: str) -> Matrix:
+    """
+    Кодирование в матрицу DataMatrix ECC200 (квадратный символ минимального размера).
+    Коды маркировки GS1 ("Честный знак": 01<GTIN>21<серийный номер>...) кодируются с FNC1
+    в начале, разделители полей GS - как FNC1
+    """
+    codewords = _datamatrix_ascii(value)
+    for size, region, data_size, ecc_size, blocks in DATAMATRIX_SIZES:
+        if len(codewords) <= data_size:
+            break
+    else:
+        raise ValueError(f'Значение слишком длинное для DataMatrix: {len(codewords)} кодовых слов')
+
+    codewords += _datamatrix_padding(len(codewords), data_size)
+    codewords += _datamatrix_ecc(codewords, ecc_size, blocks)
+    regions = size // (region + 2)  # Кол-во областей данных по стороне
+    mapping = _datamatrix_placement(codewords, regions * region)
+    return _datamatrix_symbol(mapping, size, region)
+
+
+def is_gs1(value: str) -> bool:
+    """Значение - код маркировки GS1 (GTIN в AI 01 и серийный номер в AI 21)"""
+    return len(value) >= 18 and value.startswith('01') and value[2:16].isdigit() and value[16:18] == '21'
+
+
+def _datamatrix_ascii(value: str) -> list[int]:
+    """Кодирование данных в режиме ASCII (пары цифр - одним словом)"""
+    gs1 = is_gs1(value)
+    data = value.encode('utf8')
+    codewords = [FNC1] if gs1 else []
+    i = 0
+    while i < len(data):
+        c = data[i]
+        if 48 <= c <= 57 and i + 1 < len(data) and 48 <= data[i + 1] <= 57:
+            codewords.append(130 + (c - 48) * 10 + data[i + 1] - 48)
+            i += 2
+            continue
+        if gs1 and c == ord(GS):
+            codewords.append(FNC1)
+        elif c < 128:
+            codewords.append(c + 1)
+        else:
+            codewords += [235, c - 127]  # Upper Shift: символы 128-255
+        i += 1
+    return codewords
+
+
+def _datamatrix_padding(length: int, data_size: int) -> list[int]:
+    """Заполнение свободной емкости символа: 129, далее псевдослучайные слова (253-state)"""
+    padding = []
+    for pos in range(length + 1, data_size + 1):
+        if pos == length + 1:
+            padding.append(129)
+        else:
+            pad = 129 + (149 * pos) % 253 + 1
+            padding.append(pad - 254 if pad > 254 else pad)
+    return padding
+
+
+@lru_cache(maxsize=None)
+def _gf_tables() -> tuple[list[int], list[int]]:
+    """Таблицы степеней и логарифмов GF(256) с порождающим многочленом 301 (x^8+x^5+x^3+x^2+1)"""
+    exp, log = [0] * 512, [0] * 256
+    x = 1
+    for i in range(255):
+        exp[i], log[x] = x, i
+        x <<= 1
+        if x & 0x100:
+            x ^= 301
+    for i in range(255, 512):
+        exp[i] = exp[i - 255]
+    return exp, log
+
+
+@lru_cache(maxsize=None)
+def _rs_generator(n: int) -> tuple[int, ...]:
+    """Порождающий многочлен Рида-Соломона (x + a)(x + a^2)...(x + a^n), старшая степень - первая"""
+    exp, log = _gf_tables()
+    poly = [1]
+    for i in range(1, n + 1):
+        poly = [a ^ (exp[log[b] + i] if b else 0) for a, b in zip(poly + [0], [0] + poly)]
+    return tuple(poly)
+
+
+def _datamatrix_ecc(data: Sequence[int], ecc_size: int, blocks: int) -> list[int]:
+    """Слова коррекции ошибок: данные и коррекция чередуются по блокам"""
+    exp, log = _gf_tables()
+    block_ecc = ecc_size // blocks
+    gen = _rs_generator(block_ecc)[1:]
+    ecc = [0] * ecc_size
+    for b in range(blocks):
+        rem = [0] * block_ecc
+        for d in data[b::blocks]:
+            factor = d ^ rem[0]
+            rem = rem[1:] + [0]
+            if factor:
+                lf = log[factor]
+                rem = [r ^ (exp[lf + log[g]] if g else 0) for r, g in zip(rem, gen)]
+        for i, r in enumerate(rem):
+            ecc[b + i * blocks] = r
+    return ecc
+
+
+def _datamatrix_placement(codewords: Sequence[int], n: int) -> list[list[int]]:
+    """Размещение битов кодовых слов в матрице n x n (без шаблонов поиска), алгоритм ISO/IEC 16022"""
+    array = [[-1] * n for _ in range(n)]
+
+    def module(row: int, col: int, cw: int, bit: int):
+        if row < 0:
+            row, col = row + n, col + 4 - ((n + 4) % 8)
+        if col < 0:
+            col, row = col + n, row + 4 - ((n + 4) % 8)
+        array[row][col] = (codewords[cw] >> (8 - bit)) & 1 if cw < len(codewords) else 0
+
+    def utah(row: int, col: int, cw: int):
+        for bit, (dr, dc) in enumerate(((-2, -2), (-2, -1), (-1, -2), (-1, -1), (-1, 0), (0, -2), (0, -1), (0, 0)), 1):
+            module(row + dr, col + dc, cw, bit)
+
+    def corner(cw: int, cells: Sequence[tuple[int, int]]):
+        for bit, (r, c) in enumerate(cells, 1):
+            module(r, c, cw, bit)
+
+    cw, row, col = 0, 4, 0
+    while True:
+        if row == n and col == 0:
+            corner(cw, ((n - 1, 0), (n - 1, 1), (n - 1, 2), (0, n - 2), (0, n - 1), (1, n - 1), (2, n - 1), (3, n - 1)))
+            cw += 1
+        if row == n - 2 and col == 0 and n % 4:
+            corner(cw, ((n - 3, 0), (n - 2, 0), (n - 1, 0), (0, n - 4), (0, n - 3), (0, n - 2), (0, n - 1), (1, n - 1)))
+            cw += 1
+        if row == n - 2 and col == 0 and n % 8 == 4:
+            corner(cw, ((n - 3, 0), (n - 2, 0), (n - 1, 0), (0, n - 2), (0, n - 1), (1, n - 1), (2, n - 1), (3, n - 1)))
+            cw += 1
+        if row == n + 4 and col == 2 and not n % 8:
+            corner(cw, ((n - 1, 0), (n - 1, n - 1), (0, n - 3), (0, n - 2), (0, n - 1), (1, n - 3), (1, n - 2), (1, n - 1)))
+            cw += 1
+        while True:  # Диагональ вверх-вправо
+            if row < n and col >= 0 and array[row][col] == -1:
+                utah(row, col, cw)
+                cw += 1
+            row, col = row - 2, col + 2
+            if not (row >= 0 and col < n):
+                break
+        row, col = row + 1, col + 3
+        while True:  # Диагональ вниз-влево
+            if row >= 0 and col < n and array[row][col] == -1:
+                utah(row, col, cw)
+                cw += 1
+            row, col = row + 2, col - 2
+            if not (row < n and col >= 0):
+                break
+        row, col = row + 3, col + 1
+        if not (row < n or col < n):
+            break
+
+    if array[n - 1][n - 1] == -1:  # Незаполненный правый нижний угол - фиксированный шаблон
+        array[n - 1][n - 1] = array[n - 2][n - 2] = 1
+        array[n - 1][n - 2] = array[n - 2][n - 1] = 0
+    return array
+
+
+def _datamatrix_symbol(mapping: list[list[int]], size: int, region: int) -> Matrix:
+    """Символ: области данных с шаблонами поиска (сплошные слева и снизу, пунктирные сверху и справа)"""
+    symbol = [[False] * size for _ in range(size)]
+    block = region + 2
+    for r in range(size):
+        for c in range(size):
+            rr, cc = r % block, c % block
+            if cc == 0 or rr == block - 1:
+                symbol[r][c] = True
+            elif rr == 0:
+                symbol[r][c] = cc % 2 == 0
+            elif cc == block - 1:
+                symbol[r][c] = rr % 2 == 1
+            else:
+                symbol[r][c] = bool(mapping[(r // block) * region + rr - 1][(c // block) * region + cc - 1])
+    return tuple(map(tuple, symbol))
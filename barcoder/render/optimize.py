@@ -0,0 +1,122 @@
+import zlib
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+import config as conf
+
+if TYPE_CHECKING:  # ReportLab импортируется только при старте рендеринга
+    from reportlab.pdfgen.canvas import Canvas
+    from reportlab.graphics.shapes import Drawing, Group, Rect, String
+
+__all__ = ['PdfOptions', 'configured_options', 'set_stream_compression', 'draw_compact']
+
+"""
+Оптимизация итогового PDF: уровень сжатия потоков, компактная отрисовка ШК,
+одна форма (XObject) на все экземпляры одинаковой этикетки
+"""
+
+
+class PdfOptions(NamedTuple):
+    """Параметры оптимизации PDF документа"""
+    compression_level: int = 9  # Уровень сжатия zlib (0 - без сжатия)
+    compact_barcodes: bool = True  # Полосы ШК - одним путем, без лишних операторов состояния
+    dedup_copies: bool = True  # Экземпляры (кол-ый режим FULL) и повторы этикетки - ссылки на одну форму
+    table_code128: bool = True  # Code128 - собственным кодировщиком (оптимальные наборы A/B/C), иначе ReportLab
+
+
+def configured_options() -> Optional[PdfOptions]:
+    """Параметры оптимизации из конфигурации (None - оптимизация отключена)"""
+    return PdfOptions(conf.PDF_COMPRESSION_LEVEL) if conf.PDF_OPTIMIZE else None
+
+
+class _ZCompress:
+    """Фильтр потоков PDF (как reportlab.pdfbase.pdfdoc.PDFStreamFilterZCompress) с заданным уровнем сжатия"""
+    pdfname = 'FlateDecode'
+
+    def __init__(self, level: int) -> None:
+        self.level = level
+
+    def encode(self, text):
+        if isinstance(text, str):
+            text = text.encode('utf8')
+        return zlib.compress(text, self.level)
+
+    def decode(self, encoded):
+        return zlib.decompress(encoded)
+
+
+def set_stream_compression(canvas: 'Canvas', level: int):
+    """
+    Сжатие потоков страниц и форм документа: уровень zlib, двоичные потоки без ASCII85.
+    Холст должен быть создан с pageCompression=0: ReportLab не назначает потокам свои фильтры
+    (общие для процесса, см. rl_config.useA85), и к ним применяются фильтры документа по умолчанию
+    """
+    canvas._doc.defaultStreamFilters = [_ZCompress(level)] if level > 0 else None
+
+
+def draw_compact(drawing: 'Drawing', canvas: 'Canvas', x: float, y: float):
+    """
+    Отрисовка ШК на холсте: все полосы одного цвета - один путь с одной заливкой,
+    подписи - обычным текстом. Геометрия совпадает с Drawing.drawOn.
+    Рисунки с другими элементами (обводка, фигуры) отрисовываются стандартно
+    """
+    bars: dict[str, list['Rect']] = {}
+    strings: list['String'] = []
+    if not _collect(drawing.expandUserNodes(), bars, strings):
+        drawing.drawOn(canvas, x, y)
+        return
+
+    canvas.saveState()
+    canvas.translate(x, y)
+    for rects in bars.values():
+        canvas.setFillColor(rects[0].fillColor)
+        canvas.saveState()
+        # Полосы ШК лежат на сетке модулей: в единицах модуля (от первой полосы) координаты - целые числа
+        origin, module = min(r.x for r in rects), min(r.width for r in rects)
+        if module > 0 and all(_is_whole((r.x - origin) / module) and _is_whole(r.width / module) for r in rects):
+            canvas.translate(origin, 0)
+            canvas.scale(module, 1)
+            coords = [(round((r.x - origin) / module), r.y, round(r.width / module), r.height) for r in rects]
+        else:
+            coords = [(r.x, r.y, r.width, r.height) for r in rects]
+        path = canvas.beginPath()
+        for rect in coords:
+            path.rect(*rect)
+        canvas.drawPath(path, stroke=0, fill=1)
+        canvas.restoreState()
+    for s in strings:
+        if s.fillColor is not None:
+            canvas.setFillColor(s.fillColor)
+        canvas.setFont(s.fontName, s.fontSize)
+        draw = {'start': canvas.drawString, 'middle': canvas.drawCentredString,
+                'end': canvas.drawRightString}[s.textAnchor]
+        draw(s.x, s.y, s.text)
+    canvas.restoreState()
+
+
+def _is_whole(value: float) -> bool:
+    return abs(value - round(value)) < 1e-6
+
+
+def _collect(group: 'Group', bars: dict[str, list['Rect']], strings: list['String']) -> bool:
+    """
+    Сбор залитых прямоугольников (по цвету) и подписей рисунка.
+    Возвращает False, если в рисунке есть что-то кроме них (или группы со смещением/масштабом)
+    """
+    from reportlab.graphics.shapes import Group, Rect, String
+
+    if tuple(group.transform) != (1, 0, 0, 1, 0, 0):
+        return False
+    for node in group.contents:
+        if isinstance(node, Group):
+            if not _collect(node, bars, strings):
+                return False
+        elif isinstance(node, Rect) and not (node.rx or node.ry):
+            if node.strokeColor is not None and node.strokeWidth:
+                return False
+            if node.fillColor is not None:
+                bars.setdefault(node.fillColor.hexval(), []).append(node)
+        elif isinstance(node, String) and node.textAnchor in ('start', 'middle', 'end'):
+            strings.append(node)
+        else:
+            return False
+    return True
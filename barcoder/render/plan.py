@@ -0,0 +1,102 @@
+from array import array
+from collections.abc import Sequence
+from typing import NamedTuple, Union
+
+from barcoder.parser import Data, Dataset, ProductData, LabelQtyMode
+
+__all__ = ['LabelKey', 'OrderedDataset', 'RenderPlan', 'label_key', 'make_plan']
+
+"""
+Планирование рендеринга: одинаковые этикетки (повторы строк файла) группируются,
+каждая уникальная этикетка отрисовывается один раз, повторы - ссылки на нее (см. RenderLabel)
+"""
+
+LabelKey = tuple
+
+
+def label_key(data: Data) -> LabelKey:
+    """
+    Выводимые на этикетку поля строки: одинаковый ключ - одинаковая этикетка
+    (макет и тип ШК определяются этикеткой задания и значением ШК, № строки не выводится)
+    """
+    if isinstance(data, ProductData):
+        return data.sku, data.product, data.quantity, str(data.barcode)
+    return data.quantity, data.sku, str(data.barcode)
+
+
+class OrderedDataset(Sequence):
+    """
+    Набор данных в порядке отрисовки: номера строк исходного набора (массив uint32).
+    Строки не копируются - строка-представление создается при обращении к ней (см. ColumnarDataset)
+    """
+    def __init__(self, source: Dataset, order: array) -> None:
+        self.source = source
+        self.order = order
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[Data, 'OrderedDataset']:
+        if isinstance(i, slice):
+            return OrderedDataset(self.source, self.order[i])
+        return self.source[self.order[i]]
+
+    def __iter__(self):
+        return map(self.source.__getitem__, self.order)
+
+
+class RenderPlan(NamedTuple):
+    """План рендеринга набора данных"""
+    dataset: Dataset  # Строки в порядке отрисовки (исходный набор или OrderedDataset)
+    repeated: frozenset[LabelKey]  # Этикетки, выводимые более одного раза (строки-повторы или экземпляры)
+    unique: int  # Кол-во отрисовок уникальных этикеток
+    pages: int  # Кол-во страниц (с экземплярами в кол-ом режиме FULL)
+
+    @property
+    def saved(self) -> int:
+        """Кол-во страниц, которые ссылаются на уже отрисованную этикетку, вместо повторной отрисовки"""
+        return self.pages - self.unique
+
+    def source_index(self, i: int) -> int:
+        """Индекс строки исходного набора данных по индексу строки в порядке отрисовки"""
+        return self.dataset.order[i] if isinstance(self.dataset, OrderedDataset) else i
+
+
+def make_plan(dataset: Dataset, qty_mode: LabelQtyMode, group: bool = True) -> RenderPlan:
+    """
+    План рендеринга. group - повторы следуют сразу за первой строкой этикетки
+    (одна форма и горячие кэши на всю группу, повторы не попадают в разные части PDF),
+    иначе - исходный порядок строк
+    """
+    groups: dict[LabelKey, int] = {}  # Номер группы (в порядке первого появления)
+    rows = array('I')  # Номер группы каждой строки
+    pages: list[int] = []  # Кол-во страниц группы
+    full = qty_mode is LabelQtyMode.FULL
+    for data in dataset:
+        if (n := groups.setdefault(label_key(data), len(groups))) == len(pages):
+            pages.append(0)
+        rows.append(n)
+        pages[n] += max(data.quantity, 0) if full else 1
+
+    grouped = group and any(rows[i] < rows[i - 1] for i in range(1, len(rows)))
+    return RenderPlan(
+        dataset=OrderedDataset(dataset, _group_order(rows, len(groups))) if grouped else dataset,
+        repeated=frozenset(key for key, n in groups.items() if pages[n] > 1),
+        unique=sum(1 for n in pages if n),
+        pages=sum(pages),
+    )
+
+
+def _group_order(rows: array, count: int) -> array:
+    """Номера строк, упорядоченные по группам (сортировка подсчетом, порядок внутри группы сохраняется)"""
+    starts = array('I', bytes(4 * count))
+    for n in rows:
+        starts[n] += 1
+    total = 0
+    for n in range(count):
+        starts[n], total = total, total + starts[n]
+    order = array('I', bytes(4 * len(rows)))
+    for i, n in enumerate(rows):
+        order[starts[n]] = i
+        starts[n] += 1
+    return order
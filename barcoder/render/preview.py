@@ -0,0 +1,106 @@
+import threading
+from io import BytesIO
+from typing import Hashable, Optional, Sequence
+
+from PySide6.QtCore import QBuffer, QByteArray, QObject, QSize, QThread, Signal
+from PySide6.QtGui import QImage
+
+from barcoder.parser import Data, Label, LabelType, LabelQtyMode, Font
+from barcoder.exceptions import RenderDrawError, RenderSaveError
+
+from .optimize import configured_options
+
+__all__ = ['PreviewRenderThread']
+
+PREVIEW_DPI = 203  # Разрешение печати этикеточных принтеров (TSC)
+POINTS_PER_INCH = 72
+
+
+class PreviewRenderThread(QThread):
+    """
+    Фоновая отрисовка отдельных этикеток в изображения для предпросмотра.
+    Использует ту же отрисовку, что и генерация PDF (RenderLabel), изображение получается через QtPdf.
+    Новый запрос <request> заменяет еще не начатые (устаревшие) запросы
+    """
+    signal_rendered = Signal(object, QImage)  # (ключ запроса, изображение этикетки)
+
+    def __init__(self, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self._cond = threading.Condition()
+        self._pending: list[tuple[Hashable, Data]] = []
+        self._params: Optional[tuple[Label, LabelType, Sequence[Font]]] = None
+        self._stopped = False
+
+    def set_label(self, label: Label, label_type: LabelType, fonts: Sequence[Font]):
+        """Параметры отрисовки (еще не начатые запросы отменяются)"""
+        with self._cond:
+            self._params = (label, label_type, fonts)
+            self._pending = []
+
+    def request(self, items: Sequence[tuple[Hashable, Data]]):
+        """
+        Запрос отрисовки этикеток: (ключ, данные), в порядке приоритета.
+        Заменяет все еще не начатые запросы
+        """
+        with self._cond:
+            self._pending = list(reversed(items))
+            self._cond.notify()
+        if not self.isRunning():
+            self.start()
+
+    def cancel(self):
+        """Отменить еще не начатые запросы (напр. окно предпросмотра закрыто)"""
+        with self._cond:
+            self._pending = []
+
+    def stop(self):
+        """Остановка потока (при выходе из приложения)"""
+        with self._cond:
+            self._stopped = True
+            self._pending = []
+            self._cond.notify()
+        self.wait()
+
+    def run(self):
+        try:
+            from PySide6.QtPdf import QPdfDocument  # PySide6 >= 6.4
+        except ImportError:
+            return
+
+        document = QPdfDocument(None)
+        while True:
+            with self._cond:
+                while not (self._pending or self._stopped):
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                key, data = self._pending.pop()
+                params = self._params
+
+            if params is not None and (image := self._render(document, data, *params)) is not None:
+                self.signal_rendered.emit(key, image)
+
+    @staticmethod
+    def _render(document, data: Data, label: Label, label_type: LabelType, fonts: Sequence[Font]) -> Optional[QImage]:
+        """Отрисовка одной этикетки (одна страница, без учета кол-ва) в изображение"""
+        from .render import RenderLabel
+
+        pdf = BytesIO()
+        try:
+            render = RenderLabel(pdf, label, label_type, LabelQtyMode.SHORT, fonts, configured_options())
+            render.draw(data)
+            render.save()
+        except (RenderDrawError, RenderSaveError):
+            return None
+
+        buffer = QBuffer()
+        buffer.setData(QByteArray(pdf.getvalue()))
+        buffer.open(QBuffer.ReadOnly)
+        try:
+            document.load(buffer)
+            if document.pageCount() < 1:
+                return None
+            size = document.pagePointSize(0) * (PREVIEW_DPI / POINTS_PER_INCH)
+            return document.render(0, QSize(int(size.width()), int(size.height())))
+        finally:
+            document.close()
@@ -1,8 +1,11 @@
-from typing import Sequence
+import os
+import threading
+from typing import BinaryIO, Collection, Mapping, Optional, Sequence
 
 from reportlab.pdfgen.canvas import Canvas
 from reportlab.graphics.renderPDF import Drawing
 from reportlab.graphics.barcode import createBarcodeDrawing
+from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.pdfmetrics import stringWidth, registerFont
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.units import mm
@@ -14,23 +17,45 @@ from barcoder.parser import (
 )
 from barcoder.exceptions import RenderDrawError, RenderSaveError
 
+from .optimize import PdfOptions, set_stream_compression, draw_compact
+from .plan import LabelKey, label_key
+from .matrix import MatrixSymbol, GS, is_gs1
+from .code128 import Code128Symbol
+
 Millimeters = float
 Coord_Y = float
+BarSymbol = Drawing | MatrixSymbol | Code128Symbol
+FontStamp = tuple[str, Optional[int]]  # Путь к файлу шрифта и время его изменения (нс)
+
+_registered_fonts: dict[str, FontStamp] = {}  # Шрифты, зарегистрированные приложением
+# Реестр шрифтов и шрифты TTF (чтение файла при сохранении подмножеств) ReportLab - общие для процесса:
+# регистрация, отрисовка и сохранение документов из разных потоков (генерация, предпросмотр) - по очереди
+_reportlab_lock = threading.RLock()
 
 
 class RenderLabel:
     def __init__(self,
-                 filepath: str,
+                 filepath: str | BinaryIO,
                  label: Label,
                  label_type: LabelType,
                  qty_mode: LabelQtyMode,
-                 fonts: Sequence[Font]) -> None:
+                 fonts: Sequence[Font],
+                 options: Optional[PdfOptions] = None,
+                 repeated: Collection[LabelKey] = frozenset(),
+                 code128: Optional[Mapping[str, bytes]] = None) -> None:
 
         """
         Создание документа и отрисовка одиночной этикетки (или партии одинаковых на разных листах)
-        по вызову <draw>
+        по вызову <draw>. options - оптимизация размера PDF (None - параметры ReportLab по умолчанию),
+        repeated - этикетки, которые встретятся в наборе данных повторно (см. RenderPlan),
+        code128 - ширины элементов Code128, закодированные заранее (значение ШК -> ширины, см. encode_many)
         """
         self._register_fonts(fonts)
+        self.options = options
+        self.repeated = repeated
+        self.code128 = code128 or {}
+        self.forms: dict[LabelKey, str] = {}  # Этикетки, отрисованные в формы документа
+        self._form_count = 0
 
         self.type = label_type
         self.qty_mode = qty_mode
@@ -40,18 +65,29 @@ class RenderLabel:
 
         self.doc = Canvas(
             filename=filepath,
-            pagesize=(self.width, self.height)
+            pagesize=(self.width, self.height),
+            pageCompression=None if options is None else 0,  # Сжатие - фильтрами документа
+            invariant=True  # Без меток времени: одинаковые данные - одинаковый файл
         )
+        if options is not None:
+            set_stream_compression(self.doc, options.compression_level)
+
+    @property
+    def pages(self) -> int:
+        """Кол-во отрисованных страниц"""
+        return self.doc.getPageNumber() - 1
 
     def draw(self, data: Data):
         try:
-            self._draw_label(data)
+            with _reportlab_lock:
+                self._draw_label(data)
         except Exception:
             raise RenderDrawError('Ошибка отрисовки этикетки')
 
     def save(self):
         try:
-            self.doc.save()
+            with _reportlab_lock:
+                self.doc.save()
         except Exception:
             raise RenderSaveError('Ошибка при сохранении готового PDF документа')
 
@@ -59,10 +95,7 @@ class RenderLabel:
         """
         Отрисовка одиночной этикетки, либо несколько экземпляров одинаковых этикеток
         """
-        bar_type = BarType.CODE128  # ШК на короба всегда имеют тип Code128
-        if self.type is LabelType.PRODUCT:
-            bar_type = self.recognize_bar_by_value(data.barcode)
-
+        bar_type = self.label_bar_type(self.type, self.layouts, data.barcode)
         layout = self.layouts[bar_type]  # Основные параметры для отрисовки
         barWidth = layout.bar_width * mm  # Ширина тончайшего элемента ШК (Полоса)
         barHeight = (self.height * layout.bar_height_ratio)  # Высота ШК
@@ -72,24 +105,63 @@ class RenderLabel:
         if self.qty_mode is LabelQtyMode.FULL:
             copies = data.quantity  # кол-во отрисовок ШК такое, как указано в файле, а не по одной на наимен-е
 
+        key = label_key(data)
+        form = self.forms.get(key)
+        if form is None and self.options is not None and self.options.dedup_copies \
+                and (copies > 1 or key in self.repeated):
+            # Этикетка отрисовывается один раз в форму, экземпляры и повторы на страницах - ссылки на нее
+            self._form_count += 1
+            form = f'label{self._form_count}'
+            self.doc.beginForm(form, 0, 0, self.width, self.height)
+            try:
+                self._draw_label_content(data, bar_type, layout, barWidth, barHeight, margin)
+            finally:
+                self.doc.endForm()  # Даже при ошибке отрисовки: последующие этикетки рисуются на страницах
+            self.forms[key] = form
+
         for _ in range(copies):
             self.doc.setPageSize((self.width, self.height))
-            self.doc.setFont(layout.font.name, layout.font.size)
+            if form is not None:
+                self.doc.doForm(form)
+            else:
+                self._draw_label_content(data, bar_type, layout, barWidth, barHeight, margin)
+            self.doc.showPage()  # Сохранить страницу с этикеткой
+
+    def _draw_label_content(self,
+                            data: Data,
+                            bar_type: BarType,
+                            layout: LabelLayout,
+                            barWidth: Millimeters,
+                            barHeight: Millimeters,
+                            margin: Millimeters) -> None:
+        """
+        Отрисовка содержимого одной этикетки (на странице или в форме)
+        """
+        self.doc.setFont(layout.font.name, layout.font.size)
+        bar: BarSymbol
+        if bar_type.is_2d:  # barWidth - размер модуля, barHeight - макс. размер символа
+            bar = MatrixSymbol(bar_type, str(data.barcode), barWidth, barHeight)
+        elif bar_type is BarType.CODE128 and self.options is not None and self.options.table_code128:
+            value = str(data.barcode)
+            bar = Code128Symbol(value, barWidth, barHeight, self.code128.get(value))
+        else:
             bar = createBarcodeDrawing(
                 codeName=bar_type.value,
                 value=data.barcode,
                 fontSize=layout.font.size,
                 barWidth=barWidth, barHeight=barHeight
             )
-            x_coord = (self.width - bar.width) / 2
-            y_coord = margin
+        x_coord = (self.width - bar.width) / 2
+        y_coord = margin
 
-            y_coord = self._draw_label_details(bar, bar_type, data, layout, margin, y_coord)
+        y_coord = self._draw_label_details(bar, bar_type, data, layout, margin, y_coord)
+        if isinstance(bar, Drawing) and self.options is not None and self.options.compact_barcodes:
+            draw_compact(bar, self.doc, x_coord, y_coord)
+        else:
             bar.drawOn(self.doc, x_coord, y_coord)
-            self.doc.showPage()  # Сохранить страницу с этикеткой
 
     def _draw_label_details(self,
-                            bar: Drawing,
+                            bar: BarSymbol,
                             barType: BarType,
                             data: Data,
                             layout: LabelLayout,
@@ -109,7 +181,7 @@ class RenderLabel:
         return y_coord
 
     def _draw_box_label_details(self,
-                                bar: Drawing,
+                                bar: BarSymbol,
                                 data: BoxData,
                                 layout: BoxLabelLayout,
                                 margin: Millimeters,
@@ -144,7 +216,7 @@ class RenderLabel:
         return bar_y_coord
 
     def _draw_product_label_details(self,
-                                    bar: Drawing,
+                                    bar: BarSymbol,
                                     barType: BarType,
                                     data: ProductData,
                                     layout: ProductLabelLayout,
@@ -157,6 +229,9 @@ class RenderLabel:
         if barType is BarType.CODE128:  # расположить Код под ШК
             self.doc.drawCentredString(self.width / 2, margin, text=str(data.barcode))
             bar_y_coord += layout.font.size
+        elif barType is BarType.DATAMATRIX and is_gs1(str(data.barcode)):  # Под кодом маркировки - GTIN и сер. номер
+            self.doc.drawCentredString(self.width / 2, margin, text=str(data.barcode).split(GS)[0])
+            bar_y_coord += layout.font.size
 
         lines = [f'Арт.:{data.sku}', *self._split(data.product, self.width - 3 * margin, layout.font)]
         lines[-1] += f' {data.quantity} шт.'
@@ -193,16 +268,52 @@ class RenderLabel:
 
     @staticmethod
     def _register_fonts(fonts: Sequence[Font]) -> int:
-        """Регистрация шрифтов для reportlab"""
-        return len([registerFont(TTFont(f.name, f.path)) for f in fonts])
+        """
+        Регистрация шрифтов для reportlab: зарегистрированные ранее пропускаются,
+        если не изменились путь или время изменения файла (шрифт заменен или отредактирован)
+        """
+        count = 0
+        with _reportlab_lock:
+            for f in fonts:
+                try:
+                    stamp: FontStamp = (f.path, os.stat(f.path).st_mtime_ns)
+                except OSError:
+                    stamp = (f.path, None)
+                if _registered_fonts.get(f.name) == stamp:
+                    continue
+                # ReportLab не заменяет зарегистрированный TTF шрифт: прежний удаляется из реестра
+                old = pdfmetrics._fonts.pop(f.name, None)
+                for face, font in list(pdfmetrics._dynFaceNames.items()):
+                    if font is old:
+                        del pdfmetrics._dynFaceNames[face]
+                registerFont(TTFont(f.name, f.path))
+                _registered_fonts[f.name] = stamp
+                count += 1
+        return count
+
+    @staticmethod
+    def label_bar_type(label_type: LabelType, layouts: Collection[BarType], barcode_value: str | int) -> BarType:
+        """
+        Тип ШК этикетки: на короба - всегда Code128, на товар - по значению. Если в макете этикетки
+        нет раздела для этого типа (напр. макеты без DATAMATRIX/QR) - Code128, как до их поддержки
+        """
+        if label_type is not LabelType.PRODUCT:
+            return BarType.CODE128
+        bar_type = RenderLabel.recognize_bar_by_value(barcode_value)
+        return bar_type if bar_type in layouts else BarType.CODE128
 
     @staticmethod
     def recognize_bar_by_value(barcode_value: str | int) -> BarType:
         """Определение типа ШК по его значение (кол-во цифр или сиволов)"""
         string_value = str(barcode_value)
+        if is_gs1(string_value):  # Код маркировки "Честный знак"
+            return BarType.DATAMATRIX
+
         if all(s.isdigit() for s in string_value):
             return {
                 8: BarType.EAN8, 12: BarType.UPCA, 13: BarType.EAN13
             }.get(len(string_value), BarType.CODE128)
 
+        if string_value.startswith(('http://', 'https://')):
+            return BarType.QR
         return BarType.CODE128
@@ -1,34 +1,21 @@
-from dataclasses import dataclass, field
-from typing import Sequence, Union
+from typing import Optional, Sequence
 
 from PySide6.QtCore import Qt, QThread, Signal
 from PySide6.QtWidgets import QWidget
 from PySide6.QtWidgets import QProgressDialog as pd
 from PySide6.QtWidgets import QMessageBox as mb
 
-from barcoder.parser import Data, Dataset, Label, LabelType, LabelQtyMode, Font
-from barcoder.exceptions import RenderDrawError, RenderSaveError
+from barcoder.parser import Dataset, Label, LabelType, LabelQtyMode, Font
 
-from .render import RenderLabel
+from .job import Progress, RenderJob
 
 __all__ = ['RenderThread']
 
 
-@dataclass
-class Progress:
-    current_data: Union[Data, None] = None
-    processed: int = 0
-    successed: int = 0
-    failed: int = 0
-    failed_data: list[Data] = field(default_factory=list)
-    interrupted: bool = False
-    failure: bool = False
-
-
 class RenderThread(QThread):
 
     signal_start = Signal(int)
-    signal_progress = Signal()
+    signal_progress = Signal(int, int)  # Обработано, с ошибками
     signal_finish = Signal()
 
     def __init__(self, parent: QWidget) -> None:
@@ -53,11 +40,11 @@ class RenderThread(QThread):
         self.progress_dlg.setWindowModality(Qt.WindowModal)
         self.progress_dlg.canceled.connect(self.interrupt)  # pyright: ignore
 
-    def update_progress(self):
-        """Сигнал обновления прогресса рендеринга. Обновляет Диалог прогресса"""
-        self.progress_dlg.setValue(self.progress.processed)
-        if self.progress.current_data is not None:
-            self.progress_dlg.setLabelText(f'Артикул: {self.progress.current_data.sku}')
+    def update_progress(self, processed: int, failed: int):
+        """Сигнал обновления прогресса рендеринга (не чаще PROGRESS_INTERVAL). Обновляет Диалог прогресса"""
+        self.progress_dlg.setValue(processed)
+        self.progress_dlg.setLabelText(f'Обработано: {processed} из {self.progress_dlg.maximum()}' +
+                                       (f' (ошибок: {failed})' if failed else ''))
 
     def finish_render(self):
         """
@@ -66,18 +53,32 @@ class RenderThread(QThread):
         """
         p = self.progress
         if p.failure:
-            mb(mb.Critical, 'Ошибка сохранения', 'Не удалось сохранить файл со сгенерированными этикетками',
+            text = 'Не удалось сохранить файл со сгенерированными этикетками'
+            mb(mb.Critical, 'Ошибка сохранения', text + (f'\n{p.error}' if p.error else ''),
                parent=self.parent_window).show()
 
         elif p.failed != 0:
-            msg = mb(mb.Warning, 'Внимание',
-                     f'PDF Файл создан, однако для {p.failed} наименований не были созданы этикетки',
-                     parent=self.parent_window)
-            msg.setDetailedText('\n'.join(f'{d.sku=}' for d in p.failed_data))
+            text = f'PDF Файл создан, однако для {p.failed} наименований не были созданы этикетки'
+            if p.report is not None:
+                text += f'\nСписок наименований сохранен в файл:\n{p.report}'
+            msg = mb(mb.Warning, 'Внимание', text, parent=self.parent_window)
+            details = [f'{d.sku=}' for d in p.failed_data]
+            if p.failed > len(p.failed_data):
+                details += [f'... и еще {p.failed - len(p.failed_data)}']
+            msg.setDetailedText('\n'.join(details))
             msg.show()
 
         else:
-            mb(mb.Information, 'Готово', 'PDF Файл с этикетками создан', parent=self.parent_window).show()
+            mb(mb.Information, 'Готово', 'PDF Файл с этикетками создан' + self._plan_summary(),
+               parent=self.parent_window).show()
+
+    def _plan_summary(self) -> str:
+        """Сколько страниц ссылаются на уже отрисованные этикетки (повторы и экземпляры)"""
+        plan, options = self.job.plan, self.job.options
+        if not plan.saved or options is None or not options.dedup_copies:
+            return ''
+        return (f'\nУникальных этикеток: {plan.unique} на {plan.pages} стр. '
+                f'({plan.saved} стр. - без повторной отрисовки)')
 
     def run(self,
             dataset: Dataset,
@@ -85,37 +86,15 @@ class RenderThread(QThread):
             label: Label,
             label_type: LabelType,
             qty_mode: LabelQtyMode,
-            fonts: Sequence[Font]) -> None:
+            fonts: Sequence[Font],
+            rows: Optional[Sequence[int]] = None) -> None:
         """
-        Начать процесс рендеринга
+        Начать процесс рендеринга (rows - номера рядов файла строк набора данных, для отчета об ошибках)
         """
-        self.progress = Progress()
-        self.render = RenderLabel(filepath, label, label_type, qty_mode, fonts)
+        self.job = RenderJob(dataset, filepath, label, label_type, qty_mode, fonts, rows)
+        self.progress = self.job.progress
         self.signal_start.emit(len(dataset))
 
-        [self._draw(d) for d in dataset if not self.progress.interrupted]
-        self._save()
-
-    def _draw(self, data: Data):
-        """Попытка отрисовки очередной этикетки"""
-        self.progress.current_data = data
-        self.signal_progress.emit()
-        try:
-            self.render.draw(data)
-            self.progress.successed += 1
-        except RenderDrawError:
-            self.progress.failed += 1
-            self.progress.failed_data += [data]
-        finally:
-            self.progress.processed += 1
-            self.signal_progress.emit()
-
-    def _save(self):
-        """Попытка сохранить PDF документ"""
+        self.job.run(on_progress=lambda p: self.signal_progress.emit(p.processed, p.failed))
         if not self.progress.interrupted:
-            try:
-                self.render.save()
-            except RenderSaveError:
-                self.progress.failure = True
-            finally:
-                self.signal_finish.emit()
+            self.signal_finish.emit()
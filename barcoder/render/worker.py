@@ -0,0 +1,48 @@
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+from barcoder.parser import Dataset, Label, LabelType, LabelQtyMode, Font, parse_data_file
+
+from .job import Progress, RenderJob
+
+__all__ = ['EVENT_INTERVAL', 'parse_file', 'render_file']
+
+"""
+Задачи процессов пакетной обработки (см. RenderQueue). Модуль не импортирует Qt:
+процессы пула запускаются без PySide6 и без GUI-модулей пакета barcoder.render
+"""
+
+EVENT_INTERVAL = 0.2  # Мин. интервал (сек.) между сообщениями о прогрессе от процесса рендеринга
+
+
+def parse_file(file: Path, label_type: LabelType) -> tuple[Dataset, Sequence[int], int]:
+    """
+    Парсинг файла в процессе пула.
+    Возвращает: (корректные данные, номера их рядов в файле, кол-во некорректных строк)
+    """
+    parsed = parse_data_file(file, label_type)
+    return parsed.correct_data, parsed.correct_rows, len(parsed.incorrect_data)
+
+
+def render_file(job_id: int,
+                dataset: Dataset,
+                output: Path,
+                label: Label,
+                label_type: LabelType,
+                qty_mode: LabelQtyMode,
+                fonts: Sequence[Font],
+                rows: Optional[Sequence[int]],
+                events: Any,
+                cancelled: Any) -> Progress:
+    """
+    Рендеринг в процессе пула.
+    Прогресс отправляется в очередь events не чаще EVENT_INTERVAL, там же проверяется отмена задания
+    """
+    job = RenderJob(dataset, str(output), label, label_type, qty_mode, fonts, rows)
+
+    def on_progress(p: Progress):
+        events.put((job_id, p.processed))
+        if job_id in cancelled:
+            job.interrupt()
+
+    return job.run(on_progress, interval=EVENT_INTERVAL)  # Сводка ошибок ограничена - в GUI не передается лишнего
@@ -14,3 +14,18 @@ FONT_DIRNAME = 'fonts'
 
 FONT_DIR = ROOT_DIR / 'assets' / FONT_DIRNAME
 LAYOUTS_DIR = ROOT_DIR / 'assets' / LAYOUTS_DIRNAME
+
+CACHE_DIR = HOME_DIR / f'.{APP_NAME.lower()}' / 'cache'
+THEME_CACHE_DIR = CACHE_DIR / 'theme'
+
+RENDER_CHECKPOINT_ROWS = 1000  # Кол-во строк данных в одной части PDF (контрольная точка рендеринга)
+RENDER_GROUP_REPEATS = False  # Повторы этикетки (одинаковые строки) - подряд за первой (меняет порядок страниц), иначе порядок строк файла
+PDF_OPTIMIZE = True  # Оптимизация размера PDF: сжатие, компактные ШК, одна форма на экземпляры этикетки
+PDF_COMPRESSION_LEVEL = 9  # Уровень сжатия потоков PDF (zlib: 0 - без сжатия, 9 - максимальное)
+
+# Печать на сетевые этикеточные принтеры (RAW, порт 9100): (Имя, адрес, порт).
+# Принтеры должны поддерживать прямую печать PDF
+PRINTERS: list[tuple[str, str, int]] = []
+PRINT_PAGES_PER_JOB = 50  # Кол-во страниц (этикеток) в одном задании печати
+PRINT_QUEUE_SIZE = 4  # Макс. кол-во заданий в очереди одного принтера
+PRINT_RETRIES = 3  # Кол-во повторов задания при ошибке принтера (с переподключением)
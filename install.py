@@ -1,5 +1,6 @@
 from pathlib import Path
 import subprocess as sp
+import sys
 import os
 
 from config import APP_NAME, APP_ICON
@@ -25,11 +26,14 @@ if __name__ == "__main__":
     compile_cmd = [
         'pyinstaller',
         '--noconfirm',
-        '--onefile',
+        # onedir - быстрее запуск (нет распаковки во временную директорию при каждом старте)
+        '--onedir' if '--onedir' in sys.argv else '--onefile',
         '--windowed',
         '--name', f'{APP_NAME}',
         '--icon', f'assets/img/{APP_ICON}',
-        '--collect-submodules', 'reportlab.graphics.barcode'
+        '--collect-submodules', 'reportlab.graphics.barcode',
+        '--collect-submodules', 'barcoder.render',  # Модули с Qt загружаются по имени (barcoder/render/__init__.py)
+        '--copy-metadata', 'qt-material',  # Версия qt_material - ключ кэша темы
     ]
     if os.name == 'nt':
         compile_cmd += ['--add-data', './assets;assets/', '--uac-admin']
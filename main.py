@@ -1,34 +1,66 @@
 #!/bin/env python
 
 import sys
+import multiprocessing as mp
+from time import perf_counter
+
+START_TIME = perf_counter()
 
 from PySide6.QtWidgets import QApplication, QMessageBox
 from PySide6.QtGui import QIcon
+from PySide6.QtCore import QTimer
 
-from barcoder.gui import MainWindow, rc_resources
+from barcoder.gui import MainWindow, apply_theme, rc_resources
 from barcoder.parser import LayoutsParser, parse_fonts
 from barcoder.exceptions import FontsParsingError, LayoutsParsingError
 
-from config import APP_ICON, THEME_NAME, FONT_DIR, LAYOUTS_DIR
-from qt_material import apply_stylesheet
+from config import APP_ICON, THEME_NAME, THEME_CACHE_DIR, FONT_DIR, LAYOUTS_DIR
 
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
+STARTUP_BENCH_ARG = '--startup-bench'
 
-    app.setWindowIcon(QIcon(f':/assets/img/{APP_ICON}'))
-    apply_stylesheet(app, f'{THEME_NAME}.xml')
 
+def load_layouts(win: MainWindow):
+    """
+    Парсинг шрифтов и макетов этикеток (выполняется, когда окно уже показано)
+    """
     try:
         fonts = parse_fonts(FONT_DIR)
-        layouts = LayoutsParser(LAYOUTS_DIR, fonts)
+        layouts = LayoutsParser(LAYOUTS_DIR, fonts, FONT_DIR)
     except LayoutsParsingError:
-        app = QMessageBox(QMessageBox.Critical, 'Ошибка получения шаблонов этикеток',
-                          f'Один или несколько макетов этикеток некорректны.\nПроверьте директорию {LAYOUTS_DIR}')
+        QMessageBox.critical(win, 'Ошибка получения шаблонов этикеток',
+                             f'Не удалось получить макеты этикеток.\nПроверьте директорию {LAYOUTS_DIR}')
+        win.close()
     except FontsParsingError:
-        app = QMessageBox(QMessageBox.Critical, 'Ошибка получения списка шрифтов',
-                          f'Не удалось корректно распознать список шрифтов в директории {LAYOUTS_DIR}.')
+        QMessageBox.critical(win, 'Ошибка получения списка шрифтов',
+                             f'Не удалось корректно распознать список шрифтов в директории {FONT_DIR}.')
+        win.close()
+    else:
+        win.set_layouts(layouts, fonts)
+        if layouts.errors:
+            QMessageBox.warning(win, 'Ошибка получения шаблонов этикеток',
+                                'Некоторые макеты этикеток некорректны и будут пропущены:\n' +
+                                '\n'.join(f'{f.name}: {err}' for f, err in layouts.errors.items()))
+
+
+def startup_bench(app: QApplication):
+    """Вывод времени до появления первого окна (используется scripts/startup_bench.py)"""
+    print(f'first window: {(perf_counter() - START_TIME) * 1000:.1f} ms', flush=True)
+    app.quit()
+
+
+if __name__ == "__main__":
+    mp.freeze_support()  # Процессы пакетной обработки в собранном (PyInstaller) приложении
+    app = QApplication(sys.argv)
+
+    app.setWindowIcon(QIcon(f':/assets/img/{APP_ICON}'))
+    apply_theme(app, THEME_NAME, THEME_CACHE_DIR)
+
+    win = MainWindow()
+    win.show()
+
+    if STARTUP_BENCH_ARG in sys.argv:
+        QTimer.singleShot(0, lambda: startup_bench(app))
     else:
-        win = MainWindow(layouts, fonts)
-        win.show()
+        QTimer.singleShot(0, lambda: load_layouts(win))
 
     sys.exit(app.exec())
@@ -0,0 +1,87 @@
+#!/bin/env python
+"""
+Проверка собственного кодировщика Code128 (barcoder.render.code128) без отрисовки PDF.
+
+Сценарии: кодирование столбца (encode_many) совпадает с кодированием по значению, каждое уникальное
+значение кодируется один раз, некодируемые значения - None; ширины элементов декодируются обратно
+в исходное значение (декодер scripts/golden_check.py по таблице шаблонов ReportLab):
+
+    python scripts/code128_check.py
+"""
+import sys
+from pathlib import Path
+from typing import Callable
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from barcoder.render.code128 import code128_widths, encode_code128, encode_many  # noqa: E402
+from golden_check import decode_code128  # noqa: E402
+
+VALUES = [
+    '4601234567890', 'SKU-0001', 'BOX0001', '12345', 'abc\x01def', '\xf10104601234567890',
+    'Short', '0', '1234567890123456789012', 'a1b2c3d4', 'X' * 40, '~`{|}', 'ZZ12345678abc',
+]
+INVALID = ['', 'товар', '\x80']
+
+
+def check_encode_many() -> list[str]:
+    """Столбец с повторами и некодируемыми значениями: порядок, результат и None как по значению"""
+    column = VALUES + INVALID + VALUES[::2] + INVALID[1:]
+    expected = []
+    for value in column:
+        try:
+            expected.append(code128_widths(value))
+        except ValueError:
+            expected.append(None)
+    encoded = encode_many(column)
+    errors = []
+    if encoded != expected:
+        errors.append('результат отличается от кодирования по значению')
+    if [value for value, widths in zip(column, encoded) if widths is None] != INVALID + INVALID[1:]:
+        errors.append('некодируемые значения не отмечены None')
+    return errors
+
+
+def check_unique_once() -> list[str]:
+    """Каждое уникальное значение столбца кодируется один раз"""
+    code128_widths.cache_clear()
+    encode_code128.cache_clear()
+    encode_many(VALUES * 5)
+    misses = code128_widths.cache_info().misses
+    return [] if misses == len(VALUES) else [f'закодировано {misses} раз, уникальных значений {len(VALUES)}']
+
+
+def check_round_trip() -> list[str]:
+    """Ширины элементов декодируются в исходное значение (FNC1 декодером пропускается)"""
+    errors = []
+    for value, widths in zip(VALUES, encode_many(VALUES)):
+        try:
+            decoded = decode_code128(list(widths or b''))
+        except ValueError as e:
+            decoded = f'ошибка: {e}'
+        if decoded != value.replace('\xf1', ''):
+            errors.append(f'{value!r}: декодировано {decoded!r}')
+    return errors
+
+
+CHECKS: dict[str, Callable[[], list[str]]] = {
+    'encode many': check_encode_many,
+    'unique once': check_unique_once,
+    'round trip': check_round_trip,
+}
+
+
+def main() -> int:
+    failures = 0
+    for name, check in CHECKS.items():
+        errors = check()
+        print(f'{"FAIL" if errors else "OK"} {name}')
+        for error in errors:
+            print(f'    {error}')
+        failures += bool(errors)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,674 @@
+#!/bin/env python
+"""
+Проверка эквивалентности вывода путей рендеринга (эталонный корпус).
+
+Корпус строк BoxData/ProductData (все типы ШК) отрисовывается всеми макетами из assets/layouts
+в обоих кол-ых режимах через каждый бэкенд рендеринга (BACKENDS). Содержимое страниц PDF
+нормализуется (залитые прямоугольники - в полосы-объединения, текст - строка, шрифт, размер и
+координаты в системе страницы, формы раскрываются) и сравнивается с эталоном с допуском.
+Полосы ШК каждой страницы декодируются обратно и сверяются со значением из корпуса
+(двумерные коды - через zxing-cpp, если он установлен). Эталон - вывод ReportLab: если собственный
+кодировщик Code128 кодирует значение иначе, символ сверяется по границам и декодированием:
+
+    python scripts/golden_check.py                          # все бэкенды
+    python scripts/golden_check.py --backend optimized      # один бэкенд
+    python scripts/golden_check.py --update                 # перезапись эталона (бэкенд reportlab)
+"""
+import argparse
+import json
+import math
+import re
+import sys
+from io import BytesIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, Callable, Collection, Iterator, Optional, Sequence
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from barcoder.parser import (  # noqa: E402
+    BarType, BoxData, ProductData, Dataset, Label, LabelType, LabelQtyMode, Font, LayoutsParser, parse_fonts
+)
+from barcoder.render.optimize import PdfOptions  # noqa: E402
+from barcoder.render.plan import make_plan  # noqa: E402
+import config as conf  # noqa: E402
+
+GOLDEN_FILE = ROOT_DIR / 'scripts' / 'golden' / 'labels.json'
+REFERENCE_BACKEND = 'reportlab'
+NDIGITS = 3  # Точность нормализованных координат (пункты)
+
+CORPUS: dict[LabelType, Dataset] = {
+    LabelType.PRODUCT: [
+        ProductData(1, 'TS-100', 'Футболка хлопковая белая', 1, '4601234567893'),  # EAN13
+        ProductData(2, 'SK-7', 'Носки', 2, '036000291452'),  # UPCA
+        ProductData(3, 'CP-12/A', 'Кепка летняя с регулируемым ремешком и вышивкой', 1, '12345670'),  # EAN8
+        ProductData(4, 'BG-1', 'Сумка', 1, '0123456789'),  # Code128 (набор C)
+        ProductData(5, 'BG-2', 'Сумка дорожная', 1, 'ART-00017/x'),  # Code128 (набор B)
+        ProductData(12, 'PL-3', 'Паллета', 1, 'PAL\x1d0012345/b'),  # Code128 (SHIFT, набор C)
+        ProductData(6, 'SH-40', 'Туфли', 2, '0104601234567893215abcDEF\x1d93Ab12'),  # DataMatrix (GS1)
+        ProductData(7, 'SH-41', 'Туфли замшевые', 1,
+                    '0104601234567893215Q1w2E3r4T5y6U7\x1d93AbCd\x1d24012345678901234567890'),
+        ProductData(8, 'QR-1', 'Открытка', 1, 'https://example.com/p/12345'),  # QR
+        ProductData(9, 'QR-2', 'Открытка подарочная', 1,
+                    'https://example.com/catalog/items/2024/postcards?id=1234567890&ref=label'),
+        ProductData(10, 'TS-100', 'Футболка хлопковая белая', 1, '4601234567893'),  # Повтор (RenderPlan)
+        ProductData(11, 'SH-40', 'Туфли', 2, '0104601234567893215abcDEF\x1d93Ab12'),
+    ],
+    LabelType.BOX: [
+        BoxData(2, 'BX-1', '046012345678900012'),
+        BoxData(1, 'BX-2/A', 'ABCD-000123'),
+        BoxData(2, 'BX-1', '046012345678900012'),
+    ],
+}
+
+Backend = Callable[[Dataset, Label, LabelType, LabelQtyMode, Sequence[Font]], bytes]
+Page = dict[str, Any]
+
+
+def _render(dataset: Dataset,
+            label: Label,
+            label_type: LabelType,
+            qty_mode: LabelQtyMode,
+            fonts: Sequence[Font],
+            options: Optional[PdfOptions]) -> bytes:
+    """Генерация PDF в памяти через RenderLabel (в порядке строк, повторы - по плану рендеринга)"""
+    from barcoder.render.render import RenderLabel
+
+    buf = BytesIO()
+    repeated = make_plan(dataset, qty_mode, group=False).repeated
+    render = RenderLabel(buf, label, label_type, qty_mode, fonts, options, repeated)
+    for data in dataset:
+        render.draw(data)
+    render.save()
+    return buf.getvalue()
+
+
+def render_reportlab(*args) -> bytes:
+    """Отрисовка стандартными средствами ReportLab (Drawing.drawOn, без оптимизации)"""
+    return _render(*args, options=None)
+
+
+def render_optimized(*args) -> bytes:
+    """Оптимизированный вывод: сжатие, компактные ШК, формы для экземпляров и повторов"""
+    return _render(*args, options=PdfOptions())
+
+
+def render_compact(*args) -> bytes:
+    """Оптимизированный вывод с Code128 средствами ReportLab: полосы всех ШК сверяются с эталоном точно"""
+    return _render(*args, options=PdfOptions(table_code128=False))
+
+
+def render_checkpoint(dataset: Dataset,
+                      label: Label,
+                      label_type: LabelType,
+                      qty_mode: LabelQtyMode,
+                      fonts: Sequence[Font]) -> bytes:
+    """
+    Задание рендеринга (RenderJob): несколько частей с контрольными точками, собранные в один PDF.
+    Порядок строк - исходный (страницы сопоставимы с эталоном)
+    """
+    from barcoder.render.job import RenderJob
+
+    rows, group, optimize = conf.RENDER_CHECKPOINT_ROWS, conf.RENDER_GROUP_REPEATS, conf.PDF_OPTIMIZE
+    conf.RENDER_CHECKPOINT_ROWS, conf.RENDER_GROUP_REPEATS, conf.PDF_OPTIMIZE = 2, False, True
+    try:
+        with TemporaryDirectory() as tmp:
+            filepath = Path(tmp) / 'labels.pdf'
+            progress = RenderJob(dataset, str(filepath), label, label_type, qty_mode, fonts).run()
+            if progress.failed or progress.failure:
+                raise RuntimeError(f'Ошибка рендеринга: {progress.failed} из {progress.processed}')
+            return filepath.read_bytes()
+    finally:
+        conf.RENDER_CHECKPOINT_ROWS, conf.RENDER_GROUP_REPEATS, conf.PDF_OPTIMIZE = rows, group, optimize
+
+
+BACKENDS: dict[str, Backend] = {
+    'reportlab': render_reportlab,
+    'optimized': render_optimized,
+    'compact': render_compact,
+    'checkpoint': render_checkpoint,
+}
+
+# Бэкенды с собственным кодировщиком Code128 (PdfOptions.table_code128): символ может быть короче эталонного
+TABLE_CODE128_BACKENDS = {'optimized', 'checkpoint'}
+
+
+# Нормализация содержимого страниц PDF ------------------------------------------------------------
+
+class _Name(str):
+    """Имя PDF ('/Name')"""
+
+class _Op(str):
+    """Оператор потока содержимого"""
+
+
+_WHITESPACE = b' \t\r\n\x0c\x00'
+_DELIMITERS = b'()<>[]{}/%'
+_ESCAPES = {ord('n'): b'\n', ord('r'): b'\r', ord('t'): b'\t', ord('b'): b'\b', ord('f'): b'\x0c'}
+_FILL_OPS = {'f', 'F', 'f*', 'B', 'B*', 'b', 'b*'}
+_PATH_OPS = {'m', 'l', 'c', 'v', 'y', 'h'}
+
+Matrix = tuple[float, float, float, float, float, float]
+IDENTITY: Matrix = (1, 0, 0, 1, 0, 0)
+
+
+def _tokens(data: bytes) -> Iterator[Any]:
+    """Лексемы потока содержимого: числа, имена, строки (bytes), массивы (list), операторы"""
+    i, n = 0, len(data)
+    arrays: list[list] = []
+    while i < n:
+        c = data[i]
+        if c in _WHITESPACE:
+            i += 1
+            continue
+        if c == ord('%'):  # Комментарий
+            while i < n and data[i] not in b'\r\n':
+                i += 1
+            continue
+        if c == ord('('):
+            token, i = _literal_string(data, i + 1)
+        elif data.startswith(b'<<', i) or c == ord('['):  # Словари разбираются как массивы
+            arrays.append([])
+            i += 1 if c == ord('[') else 2
+            continue
+        elif data.startswith(b'>>', i) or c == ord(']'):
+            token = arrays.pop()
+            i += 1 if c == ord(']') else 2
+        elif c == ord('<'):
+            end = data.index(b'>', i)
+            digits = re.sub(rb'\s', b'', data[i + 1:end])
+            token, i = bytes.fromhex((digits + b'0' * (len(digits) % 2)).decode()), end + 1
+        else:
+            start = i = i + (c == ord('/'))
+            while i < n and data[i] not in _WHITESPACE and data[i] not in _DELIMITERS:
+                i += 1
+            word = data[start:i].decode('latin-1')
+            if c == ord('/'):
+                token = _Name('/' + word)  # Как ключи ресурсов pypdf
+            else:
+                try:
+                    token = float(word)
+                except ValueError:
+                    token = _Op(word)
+        if arrays:
+            arrays[-1].append(token)
+        else:
+            yield token
+
+
+def _literal_string(data: bytes, i: int) -> tuple[bytes, int]:
+    """Строка в круглых скобках (с вложенными скобками и экранированием), начиная после '('"""
+    out, depth = bytearray(), 1
+    while True:
+        c = data[i]
+        i += 1
+        if c == ord('\\'):
+            c = data[i]
+            i += 1
+            if c in _ESCAPES:
+                out += _ESCAPES[c]
+            elif ord('0') <= c <= ord('7'):
+                octal = bytes([c])
+                while len(octal) < 3 and ord('0') <= data[i] <= ord('7'):
+                    octal += data[i:i + 1]
+                    i += 1
+                out.append(int(octal, 8) & 0xFF)
+            elif c == ord('\r'):
+                i += data[i] == ord('\n')
+            elif c != ord('\n'):
+                out.append(c)
+            continue
+        depth += (c == ord('(')) - (c == ord(')'))
+        if depth == 0:
+            return bytes(out), i
+        out.append(c)
+
+
+def _mul(m: Matrix, n: Matrix) -> Matrix:
+    """Произведение матриц преобразования (m применяется первой)"""
+    a, b, c, d, e, f = m
+    a2, b2, c2, d2, e2, f2 = n
+    return (a * a2 + b * c2, a * b2 + b * d2, c * a2 + d * c2, c * b2 + d * d2,
+            e * a2 + f * c2 + e2, e * b2 + f * d2 + f2)
+
+
+def _apply(m: Matrix, x: float, y: float) -> tuple[float, float]:
+    return m[0] * x + m[2] * y + m[4], m[1] * x + m[3] * y + m[5]
+
+
+class _Font:
+    """Шрифт страницы: базовое имя (без префикса подмножества) и декодирование строк в Unicode"""
+    def __init__(self, font) -> None:
+        self.name = re.sub(r'^[A-Z]{6}\+', '', str(font.get('/BaseFont', '')))
+        self.cmap: Optional[dict[int, str]] = None
+        if '/ToUnicode' in font:
+            self.cmap = {}
+            cmap = font['/ToUnicode'].get_object().get_data().decode('latin-1')
+            for block in re.findall(r'beginbfchar(.*?)endbfchar', cmap, re.S):
+                for code, uni in re.findall(r'<(\w+)>\s*<(\w+)>', block):
+                    self.cmap[int(code, 16)] = bytes.fromhex(uni).decode('utf-16-be')
+            for block in re.findall(r'beginbfrange(.*?)endbfrange', cmap, re.S):
+                for start, stop, uni in re.findall(r'<(\w+)>\s*<(\w+)>\s*<(\w+)>', block):
+                    for k, code in enumerate(range(int(start, 16), int(stop, 16) + 1)):
+                        self.cmap[code] = chr(int(uni, 16) + k)
+
+    def decode(self, string: bytes) -> str:
+        if self.cmap is None:
+            return string.decode('cp1252', 'replace')
+        return ''.join(self.cmap.get(code, '') for code in string).replace('\x00', '')  # Однобайтовые коды
+
+
+def _resolve(resources, key: str) -> dict:
+    """Словарь ресурсов (косвенные ссылки разрешаются)"""
+    value = resources.get(key)
+    return value.get_object() if value is not None else {}
+
+
+class _PageWalker:
+    """
+    Обход потока содержимого страницы (и форм): залитые прямоугольники (не белые) и строки текста
+    в координатах страницы. Подряд выводимые строки без смены позиции объединяются
+    """
+    def __init__(self) -> None:
+        self.rects: list[tuple[float, float, float, float]] = []
+        self.texts: list[list] = []
+        self.other = 0  # Залитые фигуры, кроме прямоугольников (и повернутые прямоугольники)
+
+    def walk(self, data: bytes, resources, ctm: Matrix = IDENTITY):
+        resources = resources.get_object() if resources else {}
+        fonts = {name: _Font(font.get_object()) for name, font in _resolve(resources, '/Font').items()}
+        xobjects = _resolve(resources, '/XObject')
+        stack: list[tuple[Matrix, bool]] = []
+        operands: list = []
+        white = False
+        path: list[tuple[float, float, float, float]] = []
+        curves = 0
+        tm = tlm = IDENTITY
+        leading, font, size = 0.0, None, 0.0
+        last: Optional[list] = None
+
+        for token in _tokens(data):
+            if not isinstance(token, _Op):
+                operands.append(token)
+                continue
+            op, args, operands = str(token), operands, []
+            if op == 'q':
+                stack.append((ctm, white))
+            elif op == 'Q':
+                ctm, white = stack.pop()
+            elif op == 'cm':
+                ctm = _mul(tuple(args), ctm)
+            elif op in ('g', 'rg', 'sc', 'scn'):
+                white = all(v == 1 for v in args if isinstance(v, float))
+            elif op == 'k':
+                white = all(v == 0 for v in args)
+            elif op == 're':
+                x, y, w, h = args
+                if ctm[1] or ctm[2]:
+                    curves += 1
+                else:
+                    (x0, y0), (x1, y1) = _apply(ctm, x, y), _apply(ctm, x + w, y + h)
+                    path.append((min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)))
+            elif op in _PATH_OPS:
+                curves += op == 'm'
+            elif op in _FILL_OPS or op in ('n', 'S', 's'):
+                if op in _FILL_OPS and not white:
+                    self.rects += path
+                    self.other += curves
+                path, curves = [], 0
+            elif op == 'BT':
+                tm = tlm = IDENTITY
+                last = None
+            elif op == 'Tf':
+                font, size = fonts.get(args[0]), args[1]
+            elif op == 'TL':
+                leading = args[0]
+            elif op in ('Td', 'TD', 'Tm', 'T*'):
+                if op == 'TD':
+                    leading = -args[1]
+                tlm = (tuple(args) if op == 'Tm' else
+                       _mul((1, 0, 0, 1, 0, -leading) if op == 'T*' else (1, 0, 0, 1, *args), tlm))
+                tm, last = tlm, None
+            elif op in ('Tj', 'TJ', "'", '"'):
+                if op in ("'", '"'):
+                    tlm = tm = _mul((1, 0, 0, 1, 0, -leading), tlm)
+                    last = None
+                strings = args[-1] if op == 'TJ' else [args[-1]]
+                text = ''.join(font.decode(s) if font else '' for s in strings if isinstance(s, bytes))
+                if last is not None:
+                    last[0] += text
+                else:
+                    trm = _mul(tm, ctm)
+                    x, y = _apply(trm, 0, 0)
+                    scale = math.sqrt(abs(trm[0] * trm[3] - trm[1] * trm[2]))
+                    last = [text, font.name if font else '', size * scale, x, y]
+                    self.texts.append(last)
+            elif op == 'Do':
+                xobject = xobjects[args[0]].get_object()
+                if xobject.get('/Subtype') == '/Form':
+                    matrix = tuple(float(v) for v in xobject.get('/Matrix', IDENTITY))
+                    self.walk(xobject.get_data(), xobject.get('/Resources', resources), _mul(matrix, ctm))
+
+
+def _union(spans: list[tuple[float, float]]) -> list[float]:
+    """Объединение отрезков: плоский список [x0, x1, x0, x1, ...]"""
+    merged: list[float] = []
+    for x0, x1 in sorted(spans):
+        if merged and x0 <= merged[-1]:
+            merged[-1] = max(merged[-1], x1)
+        else:
+            merged += [x0, x1]
+    return merged
+
+
+def _bands(rects: Sequence[tuple[float, float, float, float]]) -> list[list]:
+    """
+    Каноническое представление объединения прямоугольников (не зависит от того, как заливка
+    разбита на прямоугольники): горизонтальные полосы [y0, y1, [x0, x1, ...]]
+    """
+    rects = [tuple(round(v, NDIGITS) for v in r) for r in rects]
+    rects = [r for r in rects if r[2] > r[0] and r[3] > r[1]]
+    ys = sorted({y for r in rects for y in (r[1], r[3])})
+    bands: list[list] = []
+    for y0, y1 in zip(ys, ys[1:]):
+        spans = _union([(r[0], r[2]) for r in rects if r[1] <= y0 and r[3] >= y1])
+        if bands and bands[-1][1] == y0 and bands[-1][2] == spans:
+            bands[-1][1] = y1
+        elif spans:
+            bands.append([y0, y1, spans])
+    return bands
+
+
+def normalize_pdf(pdf: bytes) -> list[Page]:
+    """Нормализованное содержимое страниц PDF"""
+    from pypdf import PdfReader
+
+    pages = []
+    for page in PdfReader(BytesIO(pdf)).pages:
+        walker = _PageWalker()
+        contents = page.get_contents()
+        walker.walk(contents.get_data() if contents is not None else b'', page.get('/Resources', {}))
+        texts = sorted([t, f, round(s, NDIGITS), round(x, NDIGITS), round(y, NDIGITS)]
+                       for t, f, s, x, y in walker.texts if t.strip())
+        pages.append({'bars': _bands(walker.rects), 'texts': texts, 'other': walker.other})
+    return pages
+
+
+def compare_pages(expected: Sequence[Page],
+                  actual: Sequence[Page],
+                  tolerance: float,
+                  other_encoding: Collection[int] = ()) -> list[str]:
+    """
+    Отличия нормализованных страниц (координаты и размеры - с допуском).
+    other_encoding - номера страниц (с 0), ШК которых закодирован иначе, чем в эталоне:
+    полосы сверяются по высоте и границам символа (значение проверяется декодированием)
+    """
+    def close(a: Sequence[float], b: Sequence[float]) -> bool:
+        return len(a) == len(b) and all(abs(x - y) <= tolerance for x, y in zip(a, b))
+
+    if len(expected) != len(actual):
+        return [f'кол-во страниц: {len(actual)}, ожидалось {len(expected)}']
+    diffs = []
+    for n, (exp, act) in enumerate(zip(expected, actual), 1):
+        if n - 1 in other_encoding:
+            if len(exp['bars']) != len(act['bars']) or not all(
+                    close(e[:2], a[:2]) and e[2][0] - tolerance <= a[2][0] and a[2][-1] <= e[2][-1] + tolerance
+                    for e, a in zip(exp['bars'], act['bars'])):
+                diffs.append(f'стр. {n}: символ ШК выходит за границы эталонного')
+        elif len(exp['bars']) != len(act['bars']) or not all(
+                close(e[:2], a[:2]) and close(e[2], a[2]) for e, a in zip(exp['bars'], act['bars'])):
+            diffs.append(f'стр. {n}: полосы ШК отличаются')
+        if [t[:2] for t in exp['texts']] != [t[:2] for t in act['texts']] or not all(
+                close(e[2:], a[2:]) for e, a in zip(exp['texts'], act['texts'])):
+            diffs.append(f'стр. {n}: текст отличается: {act["texts"]}')
+        if exp['other'] != act['other']:
+            diffs.append(f'стр. {n}: фигуры (кроме прямоугольников): {act["other"]}, ожидалось {exp["other"]}')
+    return diffs
+
+
+# Декодирование ШК ------------------------------------------------------------------------------
+
+EAN_L = ['3211', '2221', '2122', '1411', '1132', '1231', '1114', '1312', '1213', '3112']  # (пробел, полоса, ...)
+EAN_G = [p[::-1] for p in EAN_L]
+EAN_PARITY = ['LLLLLL', 'LLGLGG', 'LLGGLG', 'LLGGGL', 'LGLLGG', 'LGGLLG', 'LGGGLG', 'LGLGLG', 'LGLGGL', 'LGGLGL']
+EAN_DIGITS = {BarType.EAN13: 13, BarType.UPCA: 12, BarType.EAN8: 8}
+
+
+def _modules(bars: list[list]) -> list[int]:
+    """
+    Ширины элементов (полоса, пробел, полоса, ...) в модулях по линии сканирования:
+    полоса ШК с наибольшим кол-вом элементов (для EAN - над удлиненными ограничителями)
+    """
+    if not bars:
+        raise ValueError('нет полос ШК')
+    spans = max(bars, key=lambda b: (len(b[2]), b[1] - b[0]))[2]
+    widths = [spans[i] - spans[i - 1] for i in range(1, len(spans))]
+    module = min(widths[::2])
+    modules = [round(w / module) for w in widths]
+    if any(abs(w / module - m) > 0.2 for w, m in zip(widths, modules)):
+        raise ValueError('ширины элементов не кратны модулю')
+    return modules
+
+
+def _ean_checksum(digits: str) -> int:
+    return -sum(int(d) * (3 if i % 2 == 0 else 1) for i, d in enumerate(reversed(digits))) % 10
+
+
+def decode_ean(modules: Sequence[int], digits: int) -> str:
+    """Декодирование EAN13/UPCA (12 цифр)/EAN8"""
+    half = 4 if digits == 8 else 6
+    if len(modules) != 6 + 8 * half + 5 or modules[:3] != [1, 1, 1] or modules[-3:] != [1, 1, 1] \
+            or modules[3 + 4 * half:8 + 4 * half] != [1] * 5:
+        raise ValueError('структура EAN не распознана')
+
+    def digit(n: int, start: int) -> tuple[int, str]:
+        pattern = ''.join(map(str, modules[start + 4 * n:start + 4 * n + 4]))
+        for parity, table in (('L', EAN_L), ('G', EAN_G)):
+            if pattern in table:
+                return table.index(pattern), parity
+        raise ValueError(f'символ EAN не распознан: {pattern}')
+
+    left = [digit(n, 3) for n in range(half)]
+    right = [digit(n, 8 + 4 * half) for n in range(half)]
+    if any(p != 'L' for _, p in right):
+        raise ValueError('правая половина EAN')
+    parity = ''.join(p for _, p in left)
+    value = ''.join(str(d) for d, _ in left + right)
+    if digits == 13:
+        if parity not in EAN_PARITY:
+            raise ValueError(f'четность EAN13 не распознана: {parity}')
+        value = f'{EAN_PARITY.index(parity)}{value}'
+    elif parity != 'L' * half:
+        raise ValueError(f'четность {parity}')
+    if _ean_checksum(value[:-1]) != int(value[-1]):
+        raise ValueError('контрольная цифра EAN')
+    return value
+
+
+def decode_code128(modules: Sequence[int]) -> str:
+    """Декодирование Code128 (наборы A/B/C, смена наборов, SHIFT); FNC пропускаются"""
+    # Таблица шаблонов ReportLab - независимая от приложения проверка кодирования
+    from reportlab.graphics.barcode.code128 import _patterns
+
+    table = {tuple(ord(ch.upper()) - ord('A') + 1 for ch in p): v for v, p in _patterns.items()}
+    if (len(modules) - 7) % 6 or table.get(tuple(modules[-7:])) != 106:
+        raise ValueError('структура Code128 не распознана')
+    values = [table.get(tuple(modules[i:i + 6]), -1) for i in range(0, len(modules) - 7, 6)]
+    if len(values) < 2 or -1 in values or values[0] not in (103, 104, 105):
+        raise ValueError('символ Code128 не распознан')
+    start, *data, check = values
+    if (start + sum(n * v for n, v in enumerate(data, 1))) % 103 != check:
+        raise ValueError('контрольный символ Code128')
+
+    out, code_set, shift = [], 'ABC'[start - 103], False
+    for v in data:
+        current = ('B' if code_set == 'A' else 'A') if shift else code_set
+        shift = False
+        if current == 'C' and v < 100:
+            out.append(f'{v:02d}')
+        elif current != 'C' and v < 96:
+            out.append(chr(v + 32) if current == 'B' or v < 64 else chr(v - 64))
+        elif v == 98 and current != 'C':
+            shift = True
+        elif v == 99 or (v == 100 and current != 'B') or (v == 101 and current != 'A'):
+            code_set = {99: 'C', 100: 'B', 101: 'A'}[v]
+    return ''.join(out)
+
+
+def decode_matrix(bars: list[list]) -> Optional[str]:
+    """Декодирование DataMatrix/QR через zxing-cpp (растр модулей). None - zxing-cpp не установлен"""
+    try:
+        import zxingcpp
+        from PIL import Image, ImageDraw
+    except ImportError:
+        return None
+    if not bars:
+        raise ValueError('нет модулей')
+
+    module = min(min(b[1] - b[0] for b in bars),
+                 min(b[2][i + 1] - b[2][i] for b in bars for i in range(0, len(b[2]), 2)))
+    x0, y0 = min(b[2][0] for b in bars), bars[0][0]
+    cols = round((max(b[2][-1] for b in bars) - x0) / module)
+    rows = round((bars[-1][1] - y0) / module)
+    px, quiet = 4, 4  # Пикселей на модуль, тихая зона в модулях
+    image = Image.new('L', ((cols + 2 * quiet) * px, (rows + 2 * quiet) * px), 255)
+    draw = ImageDraw.Draw(image)
+    for b0, b1, spans in bars:
+        top, bottom = rows - round((b1 - y0) / module), rows - round((b0 - y0) / module)  # Ось Y PDF - вверх
+        for i in range(0, len(spans), 2):
+            left, right = round((spans[i] - x0) / module), round((spans[i + 1] - x0) / module)
+            draw.rectangle(((left + quiet) * px, (top + quiet) * px,
+                            (right + quiet) * px - 1, (bottom + quiet) * px - 1), fill=0)
+    results = zxingcpp.read_barcodes(image)
+    if not results:
+        raise ValueError('код не распознан')
+    return bytes(results[0].bytes).decode('latin-1')
+
+
+def decode_page(page: Page, bar_type: BarType) -> Optional[str]:
+    """Значение ШК страницы (None - декодирование недоступно)"""
+    if bar_type.is_2d:
+        return decode_matrix(page['bars'])
+    if bar_type is BarType.CODE128:
+        return decode_code128(_modules(page['bars']))
+    return decode_ean(_modules(page['bars']), EAN_DIGITS[bar_type])
+
+
+def expected_pages(dataset: Dataset, label: Label, label_type: LabelType,
+                   qty_mode: LabelQtyMode) -> list[tuple[BarType, str]]:
+    """Тип и значение ШК каждой страницы"""
+    from barcoder.render.render import RenderLabel
+
+    return [(RenderLabel.label_bar_type(label_type, label.layouts, data.barcode), str(data.barcode)) for data in dataset
+            for _ in range(data.quantity if qty_mode is LabelQtyMode.FULL else 1)]
+
+
+def other_encoding(dataset: Dataset, label: Label, label_type: LabelType, qty_mode: LabelQtyMode) -> set[int]:
+    """Страницы, Code128 которых собственный кодировщик кодирует иначе, чем ReportLab (эталон)"""
+    from reportlab.graphics.barcode.code128 import Code128
+    from barcoder.render.code128 import encode_code128
+
+    def reportlab_codes(value: str) -> tuple[int, ...]:
+        symbol = Code128(value)
+        symbol.validate()
+        symbol.encode()
+        return tuple(symbol.encoded)
+
+    return {n for n, (bar_type, value) in enumerate(expected_pages(dataset, label, label_type, qty_mode))
+            if bar_type is BarType.CODE128 and reportlab_codes(value) != encode_code128(value)}
+
+
+def check_decoding(pages: Sequence[Page], dataset: Dataset, label: Label, label_type: LabelType,
+                   qty_mode: LabelQtyMode) -> tuple[list[str], int]:
+    """Сверка декодированных ШК страниц со значениями корпуса. Возвращает: (ошибки, кол-во пропущенных)"""
+    expected = expected_pages(dataset, label, label_type, qty_mode)
+    if len(expected) != len(pages):
+        return [f'кол-во страниц: {len(pages)}, ожидалось {len(expected)}'], 0
+    errors, skipped = [], 0
+    for n, (page, (bar_type, value)) in enumerate(zip(pages, expected), 1):
+        try:
+            decoded = decode_page(page, bar_type)
+        except ValueError as e:
+            errors.append(f'стр. {n}: {bar_type.value} не декодирован ({e})')
+            continue
+        if decoded is None:
+            skipped += 1
+        elif decoded != value:
+            errors.append(f'стр. {n}: {bar_type.value} {decoded!r}, ожидалось {value!r}')
+    return errors, skipped
+
+
+# Запуск ----------------------------------------------------------------------------------------
+
+def render_corpus(backend: Backend, fonts: Sequence[Font], layouts: LayoutsParser) -> Iterator[tuple]:
+    """Отрисовка корпуса бэкендом: (ключ, набор данных, этикетка, тип, режим, нормализованные страницы | ошибка)"""
+    for label_type, dataset in CORPUS.items():
+        for label in layouts.get_labels_by_type(label_type):
+            for qty_mode in LabelQtyMode:
+                key = f'{label_type.name}/{label.name}/{qty_mode.name}'
+                try:
+                    pages = normalize_pdf(backend(dataset, label, label_type, qty_mode, fonts))
+                except Exception as e:
+                    pages = e
+                yield key, dataset, label, label_type, qty_mode, pages
+
+
+def write_golden(golden: dict[str, list[Page]]):
+    """Эталон: одна страница на строку (читаемый diff)"""
+    GOLDEN_FILE.parent.mkdir(parents=True, exist_ok=True)
+    cases = [json.dumps(key, ensure_ascii=False) + ': [\n' +
+             ',\n'.join('  ' + json.dumps(page, ensure_ascii=False) for page in pages) + '\n ]'
+             for key, pages in golden.items()]
+    GOLDEN_FILE.write_text('{\n ' + ',\n '.join(cases) + '\n}\n', encoding='utf8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Сверка вывода бэкендов рендеринга с эталоном')
+    parser.add_argument('--backend', choices=BACKENDS, action='append', help='бэкенд (по умолчанию - все)')
+    parser.add_argument('--tolerance', type=float, default=0.01, help='допуск координат и размеров (пункты)')
+    parser.add_argument('--update', action='store_true', help=f'перезаписать эталон ({REFERENCE_BACKEND})')
+    args = parser.parse_args()
+
+    fonts = parse_fonts(conf.FONT_DIR)
+    layouts = LayoutsParser(conf.LAYOUTS_DIR, fonts, conf.FONT_DIR)
+
+    if args.update:
+        previous = json.loads(GOLDEN_FILE.read_text(encoding='utf8')) if GOLDEN_FILE.exists() else {}
+        golden = {}
+        for key, _, _, _, _, pages in render_corpus(BACKENDS[REFERENCE_BACKEND], fonts, layouts):
+            if isinstance(pages, Exception):
+                sys.exit(f'{key}: {pages!r}')
+            # Страницы, совпадающие с прежним эталоном в пределах допуска, не перезаписываются (чистый diff)
+            golden[key] = [next((old for old in previous.get(key, [])
+                                 if not compare_pages([old], [page], args.tolerance)), page) for page in pages]
+        write_golden(golden)
+        print(f'Эталон записан: {GOLDEN_FILE} ({len(golden)} вариантов)')
+        return
+
+    if not GOLDEN_FILE.exists():
+        sys.exit(f'Нет эталона {GOLDEN_FILE}: запустите с --update')
+    golden = json.loads(GOLDEN_FILE.read_text(encoding='utf8'))
+
+    failed = False
+    for name in args.backend or BACKENDS:
+        print(f'== {name}')
+        for key, dataset, label, label_type, qty_mode, pages in render_corpus(BACKENDS[name], fonts, layouts):
+            if isinstance(pages, Exception):
+                errors, skipped = [f'ошибка рендеринга: {pages!r}'], 0
+            elif key not in golden:
+                errors, skipped = ['нет в эталоне'], 0
+            else:
+                errors, skipped = check_decoding(pages, dataset, label, label_type, qty_mode)
+                relaxed = other_encoding(dataset, label, label_type, qty_mode) if name in TABLE_CODE128_BACKENDS else ()
+                errors = compare_pages(golden[key], pages, args.tolerance, relaxed) + errors
+            note = f' (2D не декодированы: {skipped}, нет zxing-cpp)' if skipped else ''
+            print(f'{"FAIL" if errors else "OK":<6}{key}{note}')
+            for error in errors:
+                print(f'      {error}')
+            failed |= bool(errors)
+    sys.exit(int(failed))
+
+
+if __name__ == '__main__':
+    main()
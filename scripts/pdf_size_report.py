@@ -0,0 +1,85 @@
+#!/bin/env python
+"""
+Отчет о размере PDF с этикетками: байт на этикетку (страницу) без оптимизации и с ней.
+
+Генерирует PDF в памяти для строк файла с данными (все этикетки выбранного типа)
+с параметрами ReportLab по умолчанию и с каждым шагом оптимизации (см. barcoder.render.optimize):
+
+    python scripts/pdf_size_report.py data.xlsx --type box --qty-mode full --rows 500
+"""
+import argparse
+import sys
+from io import BytesIO
+from pathlib import Path
+from typing import Optional, Sequence
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from barcoder.parser import (  # noqa: E402
+    Dataset, Label, LabelType, LabelQtyMode, Font, LayoutsParser, parse_fonts, parse_data_file
+)
+from barcoder.render.optimize import PdfOptions  # noqa: E402
+import config as conf  # noqa: E402
+
+LABEL_TYPES = {'product': LabelType.PRODUCT, 'box': LabelType.BOX}
+QTY_MODES = {'short': LabelQtyMode.SHORT, 'full': LabelQtyMode.FULL}
+
+
+def variants(level: int) -> dict[str, Optional[PdfOptions]]:
+    """Варианты параметров: без оптимизации и с последовательно включаемыми шагами"""
+    return {
+        'ReportLab': None,
+        f'сжатие {level}': PdfOptions(level, compact_barcodes=False, dedup_copies=False, table_code128=False),
+        '+ компактные ШК': PdfOptions(level, compact_barcodes=True, dedup_copies=False),
+        '+ формы': PdfOptions(level, compact_barcodes=True, dedup_copies=True),
+    }
+
+
+def render_size(dataset: Dataset,
+                label: Label,
+                label_type: LabelType,
+                qty_mode: LabelQtyMode,
+                fonts: Sequence[Font],
+                options: Optional[PdfOptions]) -> tuple[int, int]:
+    """Генерация PDF в памяти. Возвращает: (размер в байтах, кол-во страниц)"""
+    from barcoder.render.render import RenderLabel
+
+    buf = BytesIO()
+    render = RenderLabel(buf, label, label_type, qty_mode, fonts, options)
+    for data in dataset:
+        render.draw(data)
+    pages = render.pages
+    render.save()
+    return len(buf.getvalue()), pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Размер PDF на этикетку без оптимизации и с ней')
+    parser.add_argument('file', type=Path, help='файл с данными (xlsx, csv, parquet...)')
+    parser.add_argument('--type', choices=LABEL_TYPES, default='product', help='тип этикетки')
+    parser.add_argument('--qty-mode', choices=QTY_MODES, default='short', help='кол-ый режим')
+    parser.add_argument('--rows', type=int, default=1000, help='кол-во строк данных (с начала файла)')
+    parser.add_argument('--level', type=int, default=conf.PDF_COMPRESSION_LEVEL, help='уровень сжатия zlib')
+    args = parser.parse_args()
+
+    label_type, qty_mode = LABEL_TYPES[args.type], QTY_MODES[args.qty_mode]
+    fonts = parse_fonts(conf.FONT_DIR)
+    layouts = LayoutsParser(conf.LAYOUTS_DIR, fonts, conf.FONT_DIR)
+    dataset = parse_data_file(args.file, label_type).correct_data[:args.rows]
+    if not dataset:
+        sys.exit('Нет корректных данных')
+
+    names = list(variants(args.level))
+    print(f'{"Этикетка":<32}{"Стр.":>7}' + ''.join(f'{n:>18}' for n in names) + f'{"Итог":>8}')
+    for label in layouts.get_labels_by_type(label_type):
+        sizes = [render_size(dataset, label, label_type, qty_mode, fonts, options)
+                 for options in variants(args.level).values()]
+        pages = sizes[0][1]
+        per_label = [size / pages for size, _ in sizes]
+        print(f'{label.name:<32}{pages:>7}' + ''.join(f'{b:>16.0f} Б' for b in per_label) +
+              f'{per_label[-1] / per_label[0]:>8.0%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+#!/bin/env python
+"""
+Проверка распределения заданий печати (barcoder.printing.PrintDispatcher) на имитации принтеров,
+без сети: соединения заменяются объектами в памяти (параметр connect диспетчера).
+
+Сценарии: распределение по загрузке, отказ принтера (его задания уходят остальным, в т.ч. после
+окончания раздачи), подготовка заданий без блокировки диспетчера, отказ всех принтеров,
+ошибка источника заданий (потоки принтеров завершаются, соединения закрыты):
+
+    python scripts/print_dispatch_check.py
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from barcoder.exceptions import PrintError  # noqa: E402
+from barcoder.printing import Printer, PrintDispatcher  # noqa: E402
+
+JOBS = 40
+
+
+class FakePrinter:
+    """
+    Принтер в памяти: задержка приема задания, отказ после fail_after принятых заданий
+    или на задании с данными fail_on
+    """
+    def __init__(self,
+                 name: str,
+                 delay: float = 0.0,
+                 fail_after: Optional[int] = None,
+                 fail_on: Optional[bytes] = None) -> None:
+        self.printer = Printer(name, f'{name}.local')
+        self.delay = delay
+        self.fail_after = fail_after
+        self.fail_on = fail_on
+        self.received: list[bytes] = []
+        self.open = 0  # Кол-во незакрытых соединений
+        self.lock = threading.Lock()
+
+    def connect(self) -> 'FakeSocket':
+        if self.fail_after is not None and len(self.received) >= self.fail_after:
+            raise ConnectionRefusedError(self.printer.name)
+        with self.lock:
+            self.open += 1
+        return FakeSocket(self)
+
+
+class FakeSocket:
+    def __init__(self, printer: FakePrinter) -> None:
+        self.printer = printer
+        self.closed = False
+
+    def sendall(self, payload: bytes):
+        p = self.printer
+        if p.fail_after is not None and len(p.received) >= p.fail_after:
+            raise ConnectionResetError(p.printer.name)
+        time.sleep(p.delay)
+        if payload == p.fail_on:
+            raise ConnectionResetError(p.printer.name)
+        p.received.append(payload)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            with self.printer.lock:
+                self.printer.open -= 1
+
+
+def make_dispatcher(printers: list[FakePrinter]) -> PrintDispatcher:
+    by_host = {p.printer.host: p for p in printers}
+
+    def connect(address: tuple[str, int], timeout: float) -> FakeSocket:
+        return by_host[address[0]].connect()
+
+    return PrintDispatcher([p.printer for p in printers], queue_size=2, retries=1, retry_delay=0.0,
+                           connect=connect)  # pyright: ignore
+
+
+def payloads(n: int = JOBS, fail_at: Optional[int] = None) -> Iterator[bytes]:
+    for seq in range(n):
+        if seq == fail_at:
+            raise PrintError('Не удалось прочитать PDF документ: fake.pdf')
+        yield b'job-%d' % seq
+
+
+def lock_free(lock: threading.Condition) -> bool:
+    """Блокировку можно захватить из другого потока"""
+    result = []
+
+    def acquire():
+        if lock.acquire(timeout=1.0):
+            lock.release()
+            result.append(True)
+
+    thread = threading.Thread(target=acquire)
+    thread.start()
+    thread.join()
+    return bool(result)
+
+
+def jobs(printer: FakePrinter) -> list[int]:
+    return [int(payload.split(b'-')[1]) for payload in printer.received]
+
+
+def no_threads_left() -> bool:
+    return not any(t.name.startswith('printer-') for t in threading.enumerate())
+
+
+def check_balance() -> list[str]:
+    """Быстрый принтер получает больше заданий, все задания отправлены по порядку на каждом принтере"""
+    fast, slow = FakePrinter('fast', 0.001), FakePrinter('slow', 0.02)
+    report = make_dispatcher([fast, slow]).dispatch(payloads())
+    errors = []
+    if report.failed:
+        errors.append(f'неотправленные задания: {report.failed}')
+    if sorted(jobs(fast) + jobs(slow)) != list(range(JOBS)):
+        errors.append('не все задания отправлены ровно один раз')
+    if not len(jobs(fast)) > len(jobs(slow)) > 0:
+        errors.append(f'распределение: fast={len(jobs(fast))}, slow={len(jobs(slow))}')
+    if any(jobs(p) != sorted(jobs(p)) for p in (fast, slow)):
+        errors.append('нарушен порядок заданий на принтере')
+    return errors
+
+
+def check_failover() -> list[str]:
+    """Принтер отказывает: его задания (и возвращенные из очереди) отправляются остальными"""
+    good, bad = FakePrinter('good', 0.002), FakePrinter('bad', 0.002, fail_after=5)
+    report = make_dispatcher([good, bad]).dispatch(payloads())
+    errors = []
+    if report.failed:
+        errors.append(f'неотправленные задания: {report.failed}')
+    if sorted(jobs(good) + jobs(bad)) != list(range(JOBS)):
+        errors.append('не все задания отправлены ровно один раз')
+    if len(jobs(bad)) != 5:
+        errors.append(f'отказавший принтер принял {len(jobs(bad))} заданий')
+    return errors
+
+
+def check_last_job_failover() -> list[str]:
+    """Принтер отказывает на последнем задании, когда раздача уже окончена: задание отправляет другой принтер"""
+    errors = []
+    for _ in range(5):
+        fast = FakePrinter('fast', 0.001, fail_on=b'job-%d' % (JOBS - 1))
+        slow = FakePrinter('slow', 0.01)
+        report = make_dispatcher([fast, slow]).dispatch(payloads())
+        if report.failed or sorted(jobs(fast) + jobs(slow)) != list(range(JOBS)):
+            errors.append(f'неотправленные задания: {report.failed}')
+            break
+    return errors
+
+
+def check_source_unlocked() -> list[str]:
+    """Задания готовятся (чтение PDF) без блокировки диспетчера: потоки принтеров не ждут"""
+    printers = [FakePrinter('p0', 0.001), FakePrinter('p1', 0.001)]
+    dispatcher = make_dispatcher(printers)
+    locked = []
+
+    def source() -> Iterator[bytes]:
+        for payload in payloads():
+            if not lock_free(dispatcher.cond):
+                locked.append(payload)
+            yield payload
+
+    report = dispatcher.dispatch(source())
+    errors = []
+    if locked:
+        errors.append(f'задания готовятся под блокировкой диспетчера: {len(locked)}')
+    if report.failed:
+        errors.append(f'неотправленные задания: {report.failed}')
+    return errors
+
+
+def check_all_failed() -> list[str]:
+    """Все принтеры отказывают: неотправленные задания перечислены в отчете"""
+    printers = [FakePrinter('p0', fail_after=3), FakePrinter('p1', fail_after=4)]
+    report = make_dispatcher(printers).dispatch(payloads())
+    sent = sorted(jobs(printers[0]) + jobs(printers[1]))
+    errors = []
+    if sorted(sent + report.failed) != list(range(JOBS)):
+        errors.append(f'отправлено {len(sent)}, в отчете {len(report.failed)} из {JOBS}')
+    return errors
+
+
+def check_source_error() -> list[str]:
+    """Ошибка источника заданий: исключение передается вызывающему, потоки и соединения закрыты"""
+    printers = [FakePrinter('p0', 0.001), FakePrinter('p1', 0.001)]
+    errors = []
+    try:
+        make_dispatcher(printers).dispatch(payloads(fail_at=10))
+        errors.append('исключение источника заданий не передано')
+    except PrintError:
+        pass
+    if not no_threads_left():
+        errors.append('остались потоки принтеров')
+    if any(p.open for p in printers):
+        errors.append('остались открытые соединения')
+    if sorted(jobs(printers[0]) + jobs(printers[1])) != list(range(10)):
+        errors.append('поставленные в очереди задания не отправлены')
+    return errors
+
+
+CHECKS: dict[str, Callable[[], list[str]]] = {
+    'balance': check_balance,
+    'failover': check_failover,
+    'last job failover': check_last_job_failover,
+    'source unlocked': check_source_unlocked,
+    'all failed': check_all_failed,
+    'source error': check_source_error,
+}
+
+
+def main() -> int:
+    failures = 0
+    for name, check in CHECKS.items():
+        errors = check()
+        if not no_threads_left():
+            errors.append('остались потоки принтеров')
+        print(f'{"FAIL" if errors else "OK"} {name}')
+        for error in errors:
+            print(f'    {error}')
+        failures += bool(errors)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/bin/env python
+"""
+Замер времени запуска приложения.
+
+Запускает main.py с флагом -X importtime, выводит разбивку времени импорта
+по пакетам верхнего уровня и время до появления первого окна.
+Результат можно дописать в файл (json-строка на запуск) для отслеживания динамики:
+
+    python scripts/startup_bench.py --top 15 --output startup.jsonl
+"""
+import argparse
+import json
+import re
+import subprocess as sp
+import sys
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+MAIN = ROOT_DIR / 'main.py'
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+FIRST_WINDOW_LINE = re.compile(r'^first window: ([\d.]+) ms')
+
+
+def run_main() -> tuple[dict[str, float], float]:
+    """
+    Запуск приложения до первого окна.
+    Возвращает: (кумулятивное время импорта пакетов верхнего уровня в мс, время до первого окна в мс)
+    """
+    proc = sp.run([sys.executable, '-X', 'importtime', str(MAIN), '--startup-bench'],
+                  cwd=ROOT_DIR, capture_output=True, encoding='utf8')
+    if proc.returncode != 0:
+        sys.exit(proc.stderr)
+
+    packages: dict[str, float] = defaultdict(float)
+    for line in proc.stderr.splitlines():
+        # Только импорты верхнего уровня (без отступа), чтобы не учитывать время дважды
+        if (m := IMPORTTIME_LINE.match(line)) and len(m.group(3)) == 1:
+            packages[m.group(4).split('.')[0]] += int(m.group(2)) / 1000
+
+    first_window = next((float(m.group(1)) for line in proc.stdout.splitlines()
+                         if (m := FIRST_WINDOW_LINE.match(line))), float('nan'))
+    return dict(packages), first_window
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Замер времени запуска приложения')
+    parser.add_argument('--runs', type=int, default=3, help='кол-во запусков (берется лучший)')
+    parser.add_argument('--top', type=int, default=10, help='кол-во самых тяжелых пакетов в отчете')
+    parser.add_argument('--output', type=Path, help='файл, в который дописывается результат (json-строка)')
+    args = parser.parse_args()
+
+    results = [run_main() for _ in range(args.runs)]
+    packages, first_window = min(results, key=lambda r: r[1])
+    imports_total = sum(packages.values())
+
+    print(f'{"Пакет":<30}{"Импорт, мс":>12}')
+    for name, ms in sorted(packages.items(), key=lambda p: p[1], reverse=True)[:args.top]:
+        print(f'{name:<30}{ms:>12.1f}')
+    print(f'\n{"Импорты всего":<30}{imports_total:>12.1f}')
+    print(f'{"До первого окна":<30}{first_window:>12.1f}')
+
+    if args.output:
+        with args.output.open('a', encoding='utf8') as f:
+            f.write(json.dumps({
+                'date': datetime.now().isoformat(timespec='seconds'),
+                'first_window_ms': round(first_window, 1),
+                'imports_ms': round(imports_total, 1),
+                'packages_ms': {n: round(ms, 1) for n, ms in packages.items()},
+            }, ensure_ascii=False) + '\n')
+
+
+if __name__ == '__main__':
+    main()